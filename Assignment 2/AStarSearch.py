@@ -1,4 +1,15 @@
+from collections import OrderedDict
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from queue import PriorityQueue
+import heapq
+import itertools
+import time
+import weakref
+from typing import NamedTuple
+import numpy as np
 
 class Node:
     def __init__(self, position, cellValue=0):
@@ -41,33 +52,97 @@ def getNeighbors(map_obj, curr): # Get a list of neighbor positions that are pos
             neighbors.append(neighbor) 
     return neighbors
 
-def aStarSearch(map): # A* search algorithm
+def newSearchStats(): # Counters filled in by the searches when a stats dict is passed in
+    return {
+        'expanded': 0, # Nodes popped from the frontier and expanded
+        'generated': 0, # Passable neighbors looked at while expanding
+        'staleSkipped': 0, # Frontier entries skipped because the node was pushed again with a lower f (lazy deletion)
+        'closedSkipped': 0, # Frontier entries skipped because the node was already expanded
+        'frontierLeft': 0, # Frontier entries never popped because the search stopped at the goal
+        'peakFrontier': 0, # Largest number of entries in the frontier at once
+        'pushes': 0, # Frontier (heap) pushes
+        'pops': 0, # Frontier (heap) pops
+        'buildSeconds': 0.0, # Time spent building the nodes / arrays
+        'searchSeconds': 0.0, # Time spent in the search loop
+        'reconstructSeconds': 0.0, # Time spent reconstructing the path
+    }
+
+def addSearchStats(stats, **counts): # Add the counts of one search to stats. peakFrontier keeps the largest value
+    for key, value in counts.items():
+        stats[key] = max(stats[key], value) if key == 'peakFrontier' else stats[key] + value
+
+def aStarSearch(map, earlyExit=True, closedSet=True, skipStale=True, stats=None, heuristic=heuristic_manhattan): # A* search algorithm. earlyExit stops when the goal is popped, closedSet never expands a node twice and skipStale drops frontier entries whose f is outdated. With all three off, the whole reachable map is explored and the same path is returned like before. With the defaults the cost is the same, but another path of the same cost may be returned (it is on task 2 and 5). heuristic(curr, goalNode) has to be consistent for closedSet and earlyExit to give the optimal path. If a stats dict from newSearchStats is given, the search is instrumented.
+    # The counters are plain local variables, and are only written to stats at the end. The frontier counters (pushes, pops, peakFrontier) are only kept when stats is given, so without stats only a few integer additions per node remain
+    expanded = generated = staleSkipped = closedSkipped = frontierLeft = pushes = pops = peakFrontier = 0
+    counting = stats is not None
+    if stats is not None:
+        buildStart = time.perf_counter()
+
     nodes = createNodes(map) # Dictionary of nodes
     startNode = nodes[tuple(map.get_start_pos())] # Get the start node
     startNode.g = 0 # The cost of moving to the start node is 0
     goalNode = nodes[tuple(map.get_goal_pos())] # Get the goal node
+    startNode.f = heuristic(startNode, goalNode)
+    if stats is not None:
+        searchStart = time.perf_counter()
     
+    legacy = not (earlyExit or closedSet or skipStale) # With every flag off the frontier holds the nodes themselves, ordered by their current f, so ties are popped in the same order as before and the same path is found
+    counter = itertools.count() # Ties on f are popped in insertion order
     frontier = PriorityQueue() # So we dont have to sort a list each iteration
-    frontier.put(startNode, 0) # Put the start node in the frontier
+    frontier.put(startNode if legacy else (startNode.f, next(counter), startNode)) # Put the start node in the frontier. The f is stored in the entry, so we can tell if the entry is stale
+    pushes = peakFrontier = 1
+    closed = set() # Positions of the nodes that have been expanded
 
     
     while not frontier.empty():
-        currentNode = frontier.get()
+        if legacy:
+            currentNode = frontier.get()
+            f = currentNode.f
+        else:
+            f, _, currentNode = frontier.get()
+        if counting:
+            pops += 1
+
+        if skipStale and f > currentNode.f: # The node has been pushed again with a lower f, this entry is outdated
+            staleSkipped += 1
+            continue
+        if closedSet and tuple(currentNode.position) in closed: # The manhattan heuristic is consistent, so an expanded node never gets a better g
+            closedSkipped += 1
+            continue
+        if earlyExit and currentNode == goalNode: # The goal has its optimal g when it is popped
+            frontierLeft = pushes - pops
+            break
+        closed.add(tuple(currentNode.position))
+        expanded += 1
 
         for neighbor in getNeighbors(map, currentNode):
+            generated += 1
             neighborNode = nodes[tuple(neighbor)] # Get the node from the neighbor position
             cost = currentNode.g + neighborNode.cellValue # The cost of moving to the neighbor node is the cost of moving to the current node + the cell value of the neighbor node
 
             if cost < neighborNode.g: # If the cost is less than the cost of moving to the neighbor node, update the neighbor node. Better solution found
                 neighborNode.g = cost
-                neighborNode.f = cost + heuristic_manhattan(neighborNode, goalNode) # The heuristic function can either be euclidean distance or manhattan distance. From my testing, the results are the same, except on task 2, where from only visual, i think euclidian is better.
-                frontier.put(neighborNode, neighborNode.f) # Put the neighbor node in the frontier
+                neighborNode.f = cost + heuristic(neighborNode, goalNode) # The heuristic function can either be euclidean distance or manhattan distance. From my testing, the results are the same, except on task 2, where from only visual, i think euclidian is better.
+                frontier.put(neighborNode if legacy else (neighborNode.f, next(counter), neighborNode)) # Put the neighbor node in the frontier
+                if counting:
+                    pushes += 1
+                    if pushes - pops > peakFrontier:
+                        peakFrontier = pushes - pops
                 neighborNode.cameFrom = currentNode.position # Update the cameFrom attribute of the neighbor node
 
+    if stats is not None:
+        reconstructStart = time.perf_counter()
+        addSearchStats(stats, expanded=expanded, generated=generated, staleSkipped=staleSkipped,
+                       closedSkipped=closedSkipped, frontierLeft=frontierLeft, peakFrontier=peakFrontier,
+                       pushes=pushes, pops=pops, buildSeconds=searchStart - buildStart,
+                       searchSeconds=reconstructStart - searchStart)
+
     # Reconstruct the path
     path = [] 
     current = goalNode.position # Start at the goal node since we use the cameFrom attribute in the Node class.
     if goalNode.cameFrom is None:
+        if stats is not None:
+            stats['reconstructSeconds'] += time.perf_counter() - reconstructStart
         return None # No path found
     current = nodes[tuple(current)].cameFrom # Skip the goal node, such that its color doesnt change.
 
@@ -79,5 +154,373 @@ def aStarSearch(map): # A* search algorithm
         current = nodes[tuple(current)].cameFrom # Update current to the node we came from
         cost += nodes[tuple(current)].cellValue
 
+    if stats is not None:
+        stats['reconstructSeconds'] += time.perf_counter() - reconstructStart
+    print("Cost: %d" % cost)
+    return path # Return the path
+
+def neighborIndices(index, rows, cols): # Flat index version of getNeighbors. Same direction order as getNeighbors, but without building position lists.
+    x, y = divmod(index, cols)
+    if x + 1 < rows:
+        yield index + cols
+    if y + 1 < cols:
+        yield index + 1
+    if x > 0:
+        yield index - cols
+    if y > 0:
+        yield index - 1
+
+class CellEntry: # Frontier entry of aStarSearchArray when every flag is off. Like Node it is ordered by the current f of its cell, so the cells are popped in the same order as the nodes in aStarSearch
+    __slots__ = ('index', 'fScore')
+
+    def __init__(self, index, fScore):
+        self.index = index
+        self.fScore = fScore
+
+    def __lt__(self, other):
+        return self.fScore[self.index] < other.fScore[other.index]
+
+def aStarSearchArray(map, earlyExit=True, closedSet=True, skipStale=True, stats=None): # A* search directly on map.int_map. Cells are flat integer indices, g-scores and parents are numpy arrays and the frontier is a heapq, so no Node objects are created. The flags and stats work like in aStarSearch.
+    expanded = generated = staleSkipped = closedSkipped = frontierLeft = pushes = pops = peakFrontier = 0
+    counting = stats is not None
+    if stats is not None:
+        buildStart = time.perf_counter()
+
+    rows, cols = map.int_map.shape
+    costs = map.int_map.ravel() # Flat view of the cost map, index = x * cols + y
+    start = map.get_start_pos()[0] * cols + map.get_start_pos()[1]
+    goal = map.get_goal_pos()[0] * cols + map.get_goal_pos()[1]
+    goalX, goalY = divmod(goal, cols)
+
+    g = np.full(rows * cols, np.inf) # Same as Node.g
+    cameFrom = np.full(rows * cols, -1, dtype=np.int64) # Same as Node.cameFrom, -1 means no parent
+    closed = np.zeros(rows * cols, dtype=bool) # Same as the closed set in aStarSearch
+    g[start] = 0
+    if stats is not None:
+        searchStart = time.perf_counter()
+
+    legacy = not (earlyExit or closedSet or skipStale) # Same frontier ordering as aStarSearch with every flag off
+    fScore = np.full(rows * cols, np.inf) # Current f of every cell, only used by the CellEntry objects
+    counter = itertools.count() # Ties on f are popped in insertion order
+    frontier = [CellEntry(start, fScore) if legacy else (0, next(counter), start)] # (f, tie breaker, index) tuples, or CellEntry objects
+    pushes = peakFrontier = 1
+    while frontier:
+        if legacy:
+            current = heapq.heappop(frontier).index
+            f = fScore[current]
+        else:
+            f, _, current = heapq.heappop(frontier)
+        if counting:
+            pops += 1
+
+        x, y = divmod(current, cols)
+        if skipStale and f > g[current] + abs(x - goalX) + abs(y - goalY): # Outdated entry
+            staleSkipped += 1
+            continue
+        if closedSet and closed[current]:
+            closedSkipped += 1
+            continue
+        if earlyExit and current == goal:
+            frontierLeft = len(frontier)
+            break
+        closed[current] = True
+        expanded += 1
+
+        for neighbor in neighborIndices(current, rows, cols):
+            if costs[neighbor] <= 0: # Walls are not possible moves
+                continue
+            generated += 1
+            cost = g[current] + costs[neighbor]
+
+            if cost < g[neighbor]: # Better solution found
+                g[neighbor] = cost
+                x, y = divmod(neighbor, cols)
+                fScore[neighbor] = cost + abs(x - goalX) + abs(y - goalY) # Manhattan heuristic, same as aStarSearch
+                heapq.heappush(frontier, CellEntry(neighbor, fScore) if legacy else (fScore[neighbor], next(counter), neighbor))
+                if counting:
+                    pushes += 1
+                    if len(frontier) > peakFrontier:
+                        peakFrontier = len(frontier)
+                cameFrom[neighbor] = current
+
+    if stats is not None:
+        reconstructStart = time.perf_counter()
+        addSearchStats(stats, expanded=expanded, generated=generated, staleSkipped=staleSkipped,
+                       closedSkipped=closedSkipped, frontierLeft=frontierLeft, peakFrontier=peakFrontier,
+                       pushes=pushes, pops=pops, buildSeconds=searchStart - buildStart,
+                       searchSeconds=reconstructStart - searchStart)
+
+    # Reconstruct the path the same way as aStarSearch, so the path and the printed cost are the same
+    if cameFrom[goal] < 0:
+        if stats is not None:
+            stats['reconstructSeconds'] += time.perf_counter() - reconstructStart
+        return None # No path found
+    path = []
+    current = int(cameFrom[goal]) # Skip the goal node, such that its color doesnt change.
+
+    cost = 0
+
+    while current != start:
+        position = list(divmod(current, cols))
+        path.append(position)
+        map.set_cell_value(position, 0) # Set the cell value to 0, so we can see the path on the map
+        current = int(cameFrom[current])
+        cost += int(costs[current]) # The map may be int8, so sum as Python ints
+
+    if stats is not None:
+        stats['reconstructSeconds'] += time.perf_counter() - reconstructStart
     print("Cost: %d" % cost)
-    return path # Return the path
\ No newline at end of file
+    return path
+
+class SearchLog:
+    """Collects the stats of many searches, one record per query, so they
+    can be compared or checked for regressions. Use it like
+
+        stats = newSearchStats()
+        aStarSearch(map_obj, stats=stats)
+        log.add(stats, task=1, heuristic='manhattan')
+    """
+    def __init__(self):
+        self.records = []
+
+    def add(self, stats, **info): # info (e.g. task, heuristic) is stored in the same record
+        self.records.append({**info, **stats})
+
+    def writeJSON(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.records, f, indent=2)
+
+    def writeCSV(self, filename):
+        fields = []
+        for record in self.records: # Keep the column order of the first record, and add new keys as they show up
+            fields += [key for key in record if key not in fields]
+        with open(filename, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.records)
+
+class SearchResult(NamedTuple):
+    """Immutable result of GridSearch.findPath."""
+    path: tuple # ((x, y), ...) from start to goal, both included, or None if no path was found
+    cost: int # Sum of the cell values entered, or None if no path was found
+    expanded: int # Nodes expanded by the search
+    seconds: float # Wall time of the search
+
+def paintPath(map_obj, path, value=0): # Paint a path on the string map, except for the start and goal, like aStarSearch does
+    for position in path[1:-1]:
+        map_obj.set_cell_value(position, value)
+
+def findPaths(grid, queries): # Answer a chunk of queries with one GridSearch, so a process pool pickles the grid once per chunk
+    return [grid.findPath(start_pos, goal_pos) for start_pos, goal_pos in queries]
+
+def searchConcurrently(grid, queries, executor=None):
+    """Run GridSearch.findPath for every (start_pos, goal_pos) in `queries`
+    on `executor` (a concurrent.futures executor), all sharing the one
+    read-only GridSearch `grid`. A thread pool is used by default. Returns
+    the SearchResults in the same order as the queries.
+
+    A process pool pickles the arguments of every task, so with one the
+    queries are sent in one chunk per core, and the grid is only pickled
+    once per chunk instead of once per query. For many queries on a
+    process pool, ParallelSearch.parallelSearch is faster still, since the
+    workers share the map instead of receiving a copy."""
+    if executor is None:
+        with ThreadPoolExecutor() as pool:
+            return searchConcurrently(grid, queries, pool)
+    if isinstance(executor, ProcessPoolExecutor):
+        size = -(-len(queries) // (os.cpu_count() or 1)) or 1 # Queries per chunk, rounded up
+        chunks = [queries[i:i + size] for i in range(0, len(queries), size)]
+        return [result for chunk in executor.map(findPaths, itertools.repeat(grid), chunks) for result in chunk]
+    starts, goals = zip(*queries) if queries else ((), ())
+    return list(executor.map(grid.findPath, starts, goals))
+
+class GridSearch:
+    """A Map_Obj preprocessed once, so many (start, goal) queries can be
+    answered against it. The search state is reused between queries:
+    a g-value is only valid if its stamp equals the current generation,
+    so starting a new query is just incrementing the generation.
+    The string map is never touched. If a Connectivity.ConnectedComponents
+    index of the same map is given, queries between different regions
+    return None right away."""
+    def __init__(self, map_obj, components=None):
+        self.components = components
+        self.rows, self.cols = map_obj.int_map.shape
+        self.costs = map_obj.int_map.ravel().tolist() # Plain lists, since single element access is faster than on numpy arrays
+        self.neighbors = [
+            [n for n in neighborIndices(i, self.rows, self.cols) if self.costs[n] > 0] if self.costs[i] > 0 else []
+            for i in range(self.rows * self.cols)
+        ] # Passable neighbors of every cell, in the same order as getNeighbors
+        size = self.rows * self.cols
+        self.g = [0] * size
+        self.cameFrom = [-1] * size
+        self.stamp = [0] * size # Generation in which g and cameFrom were last written
+        self.closed = [0] * size # Generation in which the cell was expanded
+        self.generation = 0
+
+    def index(self, position): # [x, y] -> flat index
+        return position[0] * self.cols + position[1]
+
+    def position(self, index): # flat index -> [x, y]
+        return list(divmod(index, self.cols))
+
+    def search(self, start_pos, goal_pos):
+        """A* from start_pos to goal_pos. Returns (path, cost), where path
+        is the list of positions from start to goal (both included) and
+        cost is the sum of the cell values entered, or None if the goal
+        can not be reached."""
+        if self.components is not None and not self.components.connected(start_pos, goal_pos):
+            return None # Different regions, no need to search
+        self.generation += 1
+        generation = self.generation
+        g, cameFrom, stamp, closed = self.g, self.cameFrom, self.stamp, self.closed
+        costs, neighbors, cols = self.costs, self.neighbors, self.cols
+        start = self.index(start_pos)
+        goal = self.index(goal_pos)
+        goalX, goalY = divmod(goal, cols)
+
+        g[start] = 0
+        cameFrom[start] = -1
+        stamp[start] = generation
+        counter = itertools.count()
+        frontier = [(0, next(counter), start)]
+        while frontier:
+            _, _, current = heapq.heappop(frontier)
+            if closed[current] == generation:
+                continue
+            if current == goal:
+                return self.reconstruct(start, goal), g[goal]
+            closed[current] = generation
+            currentG = g[current]
+
+            for neighbor in neighbors[current]:
+                cost = currentG + costs[neighbor]
+                if stamp[neighbor] != generation or cost < g[neighbor]: # Not seen in this query, or better solution found
+                    g[neighbor] = cost
+                    cameFrom[neighbor] = current
+                    stamp[neighbor] = generation
+                    x, y = divmod(neighbor, cols)
+                    heapq.heappush(frontier, (cost + abs(x - goalX) + abs(y - goalY), next(counter), neighbor))
+        return None # No path found
+
+    def findPath(self, start_pos, goal_pos):
+        """Same search as search(), but all the search state is local, so
+        the GridSearch (and the Map_Obj) are only read. Many threads can
+        call this on the same GridSearch at the same time. Returns a
+        SearchResult."""
+        startTime = time.perf_counter()
+        costs, neighbors, cols = self.costs, self.neighbors, self.cols
+        start = self.index(start_pos)
+        goal = self.index(goal_pos)
+        goalX, goalY = divmod(goal, cols)
+        if self.components is not None and not self.components.connected(start_pos, goal_pos):
+            return SearchResult(None, None, 0, time.perf_counter() - startTime)
+
+        g = {start: 0}
+        cameFrom = {start: None}
+        closed = set()
+        counter = itertools.count()
+        frontier = [(0, next(counter), start)]
+        while frontier:
+            _, _, current = heapq.heappop(frontier)
+            if current in closed:
+                continue
+            if current == goal:
+                path = [goal]
+                while cameFrom[path[-1]] is not None:
+                    path.append(cameFrom[path[-1]])
+                return SearchResult(tuple(divmod(i, cols) for i in reversed(path)), g[goal],
+                                    len(closed), time.perf_counter() - startTime)
+            closed.add(current)
+
+            for neighbor in neighbors[current]:
+                cost = g[current] + costs[neighbor]
+                if cost < g.get(neighbor, float('inf')):
+                    g[neighbor] = cost
+                    cameFrom[neighbor] = current
+                    x, y = divmod(neighbor, cols)
+                    heapq.heappush(frontier, (cost + abs(x - goalX) + abs(y - goalY), next(counter), neighbor))
+        return SearchResult(None, None, len(closed), time.perf_counter() - startTime) # No path found
+
+    def reconstruct(self, start, goal): # Follow cameFrom from the goal back to the start
+        path = [self.position(goal)]
+        current = goal
+        while current != start:
+            current = self.cameFrom[current]
+            path.append(self.position(current))
+        return path[::-1]
+
+    def searchMany(self, queries):
+        """Answer every (start_pos, goal_pos) pair in `queries`, which can be
+        any iterable. Returns the list of results from search, in the same
+        order, and the throughput in queries per second."""
+        results = []
+        startTime = time.perf_counter()
+        for start_pos, goal_pos in queries:
+            results.append(self.search(start_pos, goal_pos))
+        elapsed = time.perf_counter() - startTime
+        return results, len(results) / elapsed if elapsed > 0 else float('inf')
+
+class PathCache:
+    """Size-bounded LRU cache in front of GridSearch.search.
+
+    Entries are keyed on the map, its version (Map_Obj.version is
+    increased by every cost change through set_cell_value(...,
+    str_map=False) or replace_map_values) and the start and goal
+    positions. When the version of a map changes, all of its entries are
+    dropped, since a cheaper cell anywhere can change any path, and the
+    GridSearch for the map is rebuilt. hits, misses, evictions and
+    invalidations are counted. The results are stored as (path, cost) with
+    the path as a tuple of (x, y) tuples, so a result handed out by the
+    cache can not be changed by the caller."""
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict() # (id(map), version, start, goal) -> result, least recently used first
+        self.searchers = weakref.WeakKeyDictionary() # Map_Obj -> (version, GridSearch)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def dropMap(self, map_id): # Remove every entry of the map with id map_id
+        for key in [key for key in self.entries if key[0] == map_id]:
+            del self.entries[key]
+            self.invalidations += 1
+
+    def search(self, map_obj, start_pos=None, goal_pos=None):
+        """Same as GridSearch(map_obj).search(start_pos, goal_pos), by default
+        from the start to the goal of the map, but answered from the cache
+        when possible. Returns (path, cost) with the path as a tuple of
+        (x, y) tuples, or None if the goal can not be reached."""
+        start_pos = map_obj.get_start_pos() if start_pos is None else start_pos
+        goal_pos = map_obj.get_goal_pos() if goal_pos is None else goal_pos
+        state = self.searchers.get(map_obj)
+        if state is None or state[0] != map_obj.version:
+            self.dropMap(id(map_obj)) # Outdated entries, or entries of an old map with the same id
+            state = (map_obj.version, GridSearch(map_obj))
+            self.searchers[map_obj] = state
+
+        key = (id(map_obj), map_obj.version, tuple(start_pos), tuple(goal_pos))
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        result = state[1].search(start_pos, goal_pos)
+        if result is not None:
+            result = (tuple(tuple(position) for position in result[0]), result[1])
+        self.entries[key] = result
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def stats(self): # The counters as a dict
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRate': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'size': len(self.entries),
+        }
@@ -0,0 +1,126 @@
+import heapq
+import itertools
+import time
+from typing import NamedTuple
+from AStarSearch import neighborIndices
+
+class AnytimeSolution(NamedTuple):
+    """One solution found by araStar."""
+    path: tuple # ((x, y), ...) from start to goal, both included
+    cost: int # Sum of the cell values entered
+    weight: float # Heuristic weight the solution was found with
+    bound: float # Proved bound: cost <= bound * optimal cost
+    seconds: float # Time since the search started
+    expanded: int # Expansions since the search started
+
+def araStar(map_obj, start_pos=None, goal_pos=None, weight=3.0, weightStep=0.5,
+            timeBudget=None, expansionBudget=None):
+    """Anytime Repairing A* (ARA*) on map_obj.int_map, by default from the
+    start to the goal of the map.
+
+    The first search uses f = g + weight * h with the manhattan h, which
+    finds a solution quickly. After every solution the weight is lowered
+    by weightStep, and the search continues from where it stopped: the g
+    values are kept, and the nodes that got a better g after they were
+    expanded (INCONS) are put back on the frontier. With weight 1 the
+    solution is optimal.
+
+    This is a generator that yields an AnytimeSolution after every round,
+    with the best solution so far and the bound proved for it. It stops
+    when the optimal solution is found, or when timeBudget (seconds) or
+    expansionBudget runs out. The bound of each solution is the smallest
+    of the weight and g(goal) / min(g + h) over the frontier and INCONS,
+    since no path can be cheaper than that minimum.
+    """
+    startTime = time.perf_counter()
+    rows, cols = map_obj.int_map.shape
+    costs = map_obj.int_map.ravel().tolist()
+    start_pos = map_obj.get_start_pos() if start_pos is None else start_pos
+    goal_pos = map_obj.get_goal_pos() if goal_pos is None else goal_pos
+    start = start_pos[0] * cols + start_pos[1]
+    goal = goal_pos[0] * cols + goal_pos[1]
+    goalX, goalY = divmod(goal, cols)
+
+    def h(s):
+        x, y = divmod(s, cols)
+        return abs(x - goalX) + abs(y - goalY)
+
+    g = {start: 0}
+    cameFrom = {start: None}
+    openSet = {start} # Nodes on the frontier (the heap may also hold outdated entries)
+    closed = set()
+    incons = set() # Nodes that got a better g after being expanded in this round
+    counter = itertools.count()
+    frontier = []
+    expanded = 0
+
+    def outOfBudget():
+        return (timeBudget is not None and time.perf_counter() - startTime > timeBudget) or \
+               (expansionBudget is not None and expanded >= expansionBudget)
+
+    while True:
+        # Rebuild the frontier with the current weight from OPEN and INCONS
+        openSet |= incons
+        incons = set()
+        closed = set()
+        frontier = [(g[s] + weight * h(s), next(counter), s) for s in openSet]
+        heapq.heapify(frontier)
+
+        # ImprovePath: expand until no frontier node can improve the goal
+        while frontier and g.get(goal, float('inf')) > frontier[0][0]:
+            if outOfBudget():
+                return
+            f, _, current = heapq.heappop(frontier)
+            if current not in openSet or f != g[current] + weight * h(current): # Outdated entry
+                continue
+            openSet.discard(current)
+            closed.add(current)
+            expanded += 1
+            for neighbor in neighborIndices(current, rows, cols):
+                if costs[neighbor] <= 0: # Walls are not possible moves
+                    continue
+                cost = g[current] + costs[neighbor]
+                if cost < g.get(neighbor, float('inf')):
+                    g[neighbor] = cost
+                    cameFrom[neighbor] = current
+                    if neighbor in closed:
+                        incons.add(neighbor)
+                    else:
+                        openSet.add(neighbor)
+                        heapq.heappush(frontier, (cost + weight * h(neighbor), next(counter), neighbor))
+
+        if goal not in g:
+            return # No path found
+
+        lowest = min((g[s] + h(s) for s in openSet | incons), default=float('inf'))
+        if g[goal] == 0: # The start is the goal, nothing can be cheaper
+            bound = 1.0
+        else:
+            bound = min(weight, g[goal] / lowest) if lowest > 0 else weight
+        bound = max(bound, 1.0)
+        path = [goal]
+        while cameFrom[path[-1]] is not None:
+            path.append(cameFrom[path[-1]])
+        # Nodes on the path may have been improved after g(goal) was set, so the path can be cheaper than g(goal)
+        cost = sum(costs[s] for s in path[:-1])
+        yield AnytimeSolution(tuple(divmod(s, cols) for s in reversed(path)), cost, weight, bound,
+                              time.perf_counter() - startTime, expanded)
+        if bound <= 1.0 or weight <= 1.0:
+            return # Proved optimal
+        weight = max(1.0, weight - weightStep)
+
+def anytimeSearch(map_obj, start_pos=None, goal_pos=None, timeBudget=0.005, **kwargs):
+    """Run araStar within `timeBudget` seconds and return the list of
+    solutions found. The last one is the best."""
+    return list(araStar(map_obj, start_pos, goal_pos, timeBudget=timeBudget, **kwargs))
+
+
+if __name__ == '__main__':
+    import Map
+
+    for task in range(1, 5):
+        map_obj = Map.Map_Obj(task=task)
+        print("Task %d" % task)
+        for solution in anytimeSearch(map_obj, timeBudget=0.05):
+            print("  cost %d with weight %.1f, bound %.2f, after %.2f ms and %d expansions" % (
+                solution.cost, solution.weight, solution.bound, solution.seconds * 1000, solution.expanded))
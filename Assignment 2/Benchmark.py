@@ -0,0 +1,77 @@
+import argparse
+import contextlib
+import csv
+import io
+import time
+import tracemalloc
+import Map
+import AStarSearch
+import test as graphSearch
+from MapGenerator import generateMap, generators
+
+def runAStar(map_obj, stats):
+    with contextlib.redirect_stdout(io.StringIO()): # aStarSearch prints the cost
+        return AStarSearch.aStarSearch(map_obj, stats=stats)
+
+def runGraph(map_obj, stats):
+    return graphSearch.aStarSearch(graphSearch.createGraph(map_obj), map_obj.get_start_pos(), map_obj.get_goal_pos(), stats)
+
+engines = {'aStarSearch': runAStar, 'graph': runGraph}
+
+def measure(engine, filename, start, goal):
+    """Run `engine` on the map in `filename`. Returns (seconds, peak memory
+    in bytes, expansions, found). tracemalloc makes the search several
+    times slower, so the time is taken from a first run without it and
+    the peak memory (allocated on top of the loaded map) from a second
+    run. Each run gets a fresh map, since aStarSearch paints the path on
+    the map."""
+    stats = AStarSearch.newSearchStats()
+    map_obj = Map.Map_Obj.from_file(filename, start, goal)
+    startTime = time.perf_counter()
+    path = engines[engine](map_obj, stats)
+    seconds = time.perf_counter() - startTime
+
+    map_obj = Map.Map_Obj.from_file(filename, start, goal)
+    tracemalloc.start()
+    engines[engine](map_obj, AStarSearch.newSearchStats())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, stats['expanded'], path is not None
+
+def benchmark(sizes, kinds, seed=0, graphMax=1000, searchMax=2000):
+    """Run every engine on the generated maps of every kind and size, and
+    return one row (a dict) per run. The engines build a Python object per
+    cell, so maps above graphMax (graph) or searchMax (aStarSearch) are
+    skipped, since they take minutes and several GB at 4000x4000."""
+    rows = []
+    for kind in kinds:
+        for size in sizes:
+            filename, start, goal = generateMap(kind, size, seed)
+            for engine, maxSize in (('aStarSearch', searchMax), ('graph', graphMax)):
+                if size > maxSize:
+                    continue
+                seconds, peak, expanded, found = measure(engine, filename, start, goal)
+                rows.append({'kind': kind, 'size': size, 'engine': engine, 'seconds': seconds,
+                             'peakMB': peak / 2**20, 'expanded': expanded, 'found': found})
+                print("%-5s %5d %-12s %9.3f s %9.1f MB %9d expanded%s" % (
+                    kind, size, engine, seconds, peak / 2**20, expanded, '' if found else ', no path'))
+    return rows
+
+def writeCSV(rows, filename):
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['kind', 'size', 'engine', 'seconds', 'peakMB', 'expanded', 'found'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time aStarSearch and the test.py graph search on generated maps")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 250, 500, 1000])
+    parser.add_argument('--kinds', nargs='+', choices=list(generators), default=list(generators))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--graph-max', type=int, default=1000, help="Largest size to run the graph search on")
+    parser.add_argument('--search-max', type=int, default=2000, help="Largest size to run aStarSearch on")
+    parser.add_argument('--out', default='benchmark.csv')
+    args = parser.parse_args()
+
+    writeCSV(benchmark(args.sizes, args.kinds, args.seed, args.graph_max, args.search_max), args.out)
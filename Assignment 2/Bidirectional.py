@@ -0,0 +1,117 @@
+import heapq
+import itertools
+from AStarSearch import neighborIndices, newSearchStats
+
+def bidirectionalSearch(map_obj, start_pos=None, goal_pos=None, stats=None):
+    """Bidirectional A* on map_obj.int_map, by default from the start to the
+    goal of the map. The forward search pays for entering each cell like
+    aStarSearch. The backward search runs on the reversed moves, so going
+    back from x to y costs the value of x. Both sides use the balanced
+    potential p(v) = (h(v, goal) - h(start, v)) / 2 with the manhattan
+    distance h, the forward search with +p and the backward search with
+    -p. Since every move costs at least 1, both are consistent, and the
+    reduced costs are the same in both directions.
+
+    mu is the cost of the best path found where the two searches meet.
+    With these potentials, any path cheaper than mu would need the
+    smallest keys of the two frontiers to add up to less than mu, so the
+    search stops when they add up to mu or more. The cost is therefore the
+    same optimal cost as the unidirectional search.
+
+    Returns (path, cost), where path is the list of positions from start
+    to goal (both included), or None if no path is found. If a stats dict
+    from newSearchStats is given, expansions of both sides and the peak
+    size of the two frontiers together are counted in it.
+    """
+    if stats is None:
+        stats = newSearchStats()
+    rows, cols = map_obj.int_map.shape
+    costs = map_obj.int_map.ravel().tolist()
+    start_pos = map_obj.get_start_pos() if start_pos is None else start_pos
+    goal_pos = map_obj.get_goal_pos() if goal_pos is None else goal_pos
+    start = start_pos[0] * cols + start_pos[1]
+    goal = goal_pos[0] * cols + goal_pos[1]
+
+    def manhattan(a, b):
+        ax, ay = divmod(a, cols)
+        bx, by = divmod(b, cols)
+        return abs(ax - bx) + abs(ay - by)
+
+    def potential(v, side): # +p for the forward search, -p for the backward search
+        p = (manhattan(v, goal) - manhattan(start, v)) / 2
+        return p if side == 0 else -p
+
+    counter = itertools.count()
+    # Index 0 is the forward search, index 1 the backward search
+    g = [{start: 0}, {goal: 0}]
+    cameFrom = [{start: None}, {goal: None}]
+    closed = [set(), set()]
+    frontiers = [[(potential(start, 0), next(counter), start)], [(potential(goal, 1), next(counter), goal)]]
+    mu = 0 if start == goal else float('inf')
+    meeting = start if start == goal else None
+
+    while frontiers[0] and frontiers[1]:
+        if frontiers[0][0][0] + frontiers[1][0][0] >= mu:
+            break
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1 # Expand the smaller frontier
+        f, _, current = heapq.heappop(frontiers[side])
+        if current in closed[side]:
+            stats['closedSkipped'] += 1
+            continue
+        if f > g[side][current] + potential(current, side): # Outdated entry
+            stats['staleSkipped'] += 1
+            continue
+        closed[side].add(current)
+        stats['expanded'] += 1
+
+        other = 1 - side
+        for neighbor in neighborIndices(current, rows, cols):
+            if costs[neighbor] <= 0: # Walls are not possible moves
+                continue
+            cost = g[side][current] + (costs[neighbor] if side == 0 else costs[current])
+            if cost < g[side].get(neighbor, float('inf')):
+                g[side][neighbor] = cost
+                cameFrom[side][neighbor] = current
+                heapq.heappush(frontiers[side], (cost + potential(neighbor, side), next(counter), neighbor))
+                if neighbor in g[other] and cost + g[other][neighbor] < mu: # The searches meet in neighbor
+                    mu = cost + g[other][neighbor]
+                    meeting = neighbor
+        stats['peakFrontier'] = max(stats['peakFrontier'], len(frontiers[0]) + len(frontiers[1]))
+
+    if meeting is None:
+        return None # No path found
+
+    path = []
+    current = meeting
+    while current is not None: # Back to the start
+        path.append(list(divmod(current, cols)))
+        current = cameFrom[0][current]
+    path.reverse()
+    current = cameFrom[1][meeting]
+    while current is not None: # On to the goal
+        path.append(list(divmod(current, cols)))
+        current = cameFrom[1][current]
+    return path, mu
+
+
+if __name__ == '__main__':
+    import contextlib
+    import io
+    import time
+    import Map
+    import AStarSearch
+
+    for task in range(1, 5):
+        map_obj = Map.Map_Obj(task=task)
+        uni, bi = newSearchStats(), newSearchStats()
+        startTime = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()): # aStarSearchArray prints the cost
+            AStarSearch.aStarSearchArray(map_obj, stats=uni)
+        uniTime = time.perf_counter() - startTime
+        startTime = time.perf_counter()
+        _, cost = bidirectionalSearch(map_obj, stats=bi)
+        biTime = time.perf_counter() - startTime
+        print("Task %d: cost %d | unidirectional: %d expanded, peak frontier %d, %.2f ms"
+              " | bidirectional: %d expanded, peak frontier %d, %.2f ms" % (
+                  task, cost, uni['expanded'], uni['peakFrontier'], uniTime * 1000,
+                  bi['expanded'], bi['peakFrontier'], biTime * 1000))
@@ -0,0 +1,107 @@
+import numpy as np
+from AStarSearch import neighborIndices
+
+class ConnectedComponents:
+    """Labels the connected regions of passable cells (value > 0) of a
+    Map_Obj, so a query whose start and goal are in different regions can
+    be rejected in O(1) instead of exploring the whole region first.
+
+    The labels are built with one union-find pass over all the pairs of
+    neighboring passable cells (found with numpy). When a cell flips
+    between wall and floor through setCellValue / cellChanged, only the
+    regions around that cell are relabeled.
+    """
+    def __init__(self, map_obj):
+        self.map = map_obj
+        self.rows, self.cols = map_obj.int_map.shape
+        passable = np.asarray(map_obj.int_map) > 0
+        self.passable = passable.ravel().tolist()
+
+        # Pairs of passable neighbors, below and to the right of each other
+        indices = np.arange(self.rows * self.cols).reshape(self.rows, self.cols)
+        down = passable[:-1, :] & passable[1:, :]
+        right = passable[:, :-1] & passable[:, 1:]
+        pairs = zip(np.concatenate([indices[:-1, :][down], indices[:, :-1][right]]).tolist(),
+                    np.concatenate([indices[1:, :][down], indices[:, 1:][right]]).tolist())
+
+        parent = list(range(self.rows * self.cols))
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]] # Path halving
+                x = parent[x]
+            return x
+        for a, b in pairs:
+            rootA, rootB = find(a), find(b)
+            if rootA != rootB:
+                parent[rootB] = rootA
+
+        # Number the roots 0, 1, 2, ... and give walls the label -1
+        roots = np.array([find(x) for x in range(self.rows * self.cols)])
+        _, labels = np.unique(roots, return_inverse=True)
+        labels[~passable.ravel()] = -1
+        self.labels = labels.ravel().tolist()
+        self.nextLabel = int(labels.max()) + 1
+        self.sizes = {} # Label -> number of cells
+        for label in self.labels:
+            if label >= 0:
+                self.sizes[label] = self.sizes.get(label, 0) + 1
+
+    def label(self, position):
+        """The region of the cell at `position`, or -1 for a wall."""
+        return self.labels[position[0] * self.cols + position[1]]
+
+    def connected(self, start_pos, goal_pos):
+        """True if there is a path from `start_pos` to `goal_pos`."""
+        label = self.label(start_pos)
+        return label >= 0 and label == self.label(goal_pos)
+
+    def flood(self, start, label):
+        # Give `label` to every passable cell connected to `start`, return how many
+        self.labels[start] = label
+        stack = [start]
+        count = 0
+        while stack:
+            current = stack.pop()
+            count += 1
+            for neighbor in neighborIndices(current, self.rows, self.cols):
+                if self.passable[neighbor] and self.labels[neighbor] != label:
+                    self.labels[neighbor] = label
+                    stack.append(neighbor)
+        return count
+
+    def cellChanged(self, position):
+        """Let the index know the cell at `position` has been changed in
+        the int map. Cost changes between floor values do nothing."""
+        index = position[0] * self.cols + position[1]
+        passable = self.map.get_cell_value(position) > 0
+        if passable == self.passable[index]:
+            return
+        self.passable[index] = passable
+        neighbors = [n for n in neighborIndices(index, self.rows, self.cols) if self.passable[n]]
+
+        if passable: # A new floor cell joins its neighbors' regions into one
+            regions = sorted({self.labels[n] for n in neighbors}, key=lambda label: self.sizes[label])
+            if not regions:
+                self.labels[index] = self.nextLabel
+                self.sizes[self.nextLabel] = 1
+                self.nextLabel += 1
+                return
+            largest = regions[-1]
+            self.sizes[largest] += 1 + sum(self.sizes.pop(label) for label in regions[:-1])
+            self.labels[index] = -2 # Not labeled yet
+            self.flood(index, largest) # Only walks the smaller regions, cells of the largest are skipped
+        else: # A new wall may split its region, relabel the pieces around it
+            old = self.labels[index]
+            self.labels[index] = -1
+            del self.sizes[old]
+            for n in neighbors:
+                self.labels[n] = -2 # Not labeled yet
+            for n in neighbors:
+                if self.labels[n] == -2:
+                    self.sizes[self.nextLabel] = self.flood(n, self.nextLabel)
+                    self.nextLabel += 1
+
+    def setCellValue(self, position, value):
+        """Change the value of a cell in the map and in the index."""
+        self.map.set_cell_value(position, value, str_map=False)
+        self.cellChanged(position)
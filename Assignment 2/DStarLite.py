@@ -0,0 +1,143 @@
+import heapq
+import itertools
+from AStarSearch import neighborIndices
+
+class DStarLite:
+    """Incremental planner for the moving goal of task 5 (D* Lite).
+
+    The search tree is rooted at the start position, and g(s) is the cost
+    of the cheapest known path from the start to s. The goal only steers
+    the search through the heuristic, so when it moves the tree is kept
+    and the key modifier km is increased instead of clearing the queue.
+    When a cell cost changes, only that cell and its neighbors are put
+    back on the queue, and computeShortestPath repairs the part of the
+    tree that depends on them.
+    """
+    def __init__(self, map_obj):
+        self.map = map_obj
+        self.rows, self.cols = map_obj.int_map.shape
+        self.costs = map_obj.int_map.ravel().tolist() # Own copy, kept in sync through cellChanged
+        size = self.rows * self.cols
+        self.g = [float('inf')] * size
+        self.rhs = [float('inf')] * size # One step lookahead of g
+        self.keys = {} # Current key of every cell in the queue, older heap entries are skipped
+        self.queue = [] # heapq of (key, tie breaker, index)
+        self.counter = itertools.count()
+        self.km = 0 # Sum of the heuristic distances the goal has moved
+        self.expanded = 0 # Cells expanded by the last computeShortestPath
+
+        self.start = self.index(map_obj.get_start_pos())
+        self.goal = self.index(map_obj.get_goal_pos())
+        self.rhs[self.start] = 0
+        self.push(self.start)
+
+    def index(self, position): # [x, y] -> flat index
+        return position[0] * self.cols + position[1]
+
+    def position(self, index): # flat index -> [x, y]
+        return list(divmod(index, self.cols))
+
+    def heuristic(self, a, b): # Manhattan distance between two flat indices
+        ax, ay = divmod(a, self.cols)
+        bx, by = divmod(b, self.cols)
+        return abs(ax - bx) + abs(ay - by)
+
+    def calculateKey(self, s):
+        best = min(self.g[s], self.rhs[s])
+        return (best + self.heuristic(s, self.goal) + self.km, best)
+
+    def push(self, s):
+        key = self.calculateKey(s)
+        self.keys[s] = key
+        heapq.heappush(self.queue, (key, next(self.counter), s))
+
+    def topKey(self): # Smallest key in the queue, dropping outdated entries
+        while self.queue:
+            key, _, s = self.queue[0]
+            if self.keys.get(s) == key:
+                return key
+            heapq.heappop(self.queue)
+        return (float('inf'), float('inf'))
+
+    def updateVertex(self, s):
+        if s != self.start:
+            if self.costs[s] <= 0: # Walls can not be reached
+                self.rhs[s] = float('inf')
+            else: # Cheapest way to enter s from one of its passable neighbors
+                self.rhs[s] = min([self.g[n] for n in neighborIndices(s, self.rows, self.cols)
+                                   if self.costs[n] > 0], default=float('inf')) + self.costs[s]
+        self.keys.pop(s, None)
+        if self.g[s] != self.rhs[s]:
+            self.push(s)
+
+    def computeShortestPath(self):
+        self.expanded = 0
+        while (self.topKey() < self.calculateKey(self.goal) or self.rhs[self.goal] != self.g[self.goal]) and self.queue:
+            oldKey, _, u = heapq.heappop(self.queue)
+            del self.keys[u]
+            self.expanded += 1
+            if oldKey < self.calculateKey(u): # The key is outdated, because the goal has moved
+                self.push(u)
+            elif self.g[u] > self.rhs[u]: # Overconsistent, a better path to u has been found
+                self.g[u] = self.rhs[u]
+                for s in neighborIndices(u, self.rows, self.cols):
+                    self.updateVertex(s)
+            else: # Underconsistent, the old path to u got more expensive
+                self.g[u] = float('inf')
+                self.updateVertex(u)
+                for s in neighborIndices(u, self.rows, self.cols):
+                    self.updateVertex(s)
+
+    def moveGoal(self, position):
+        """Let the planner know the goal is now at `position`."""
+        newGoal = self.index(position)
+        self.km += self.heuristic(self.goal, newGoal)
+        self.goal = newGoal
+
+    def cellChanged(self, position):
+        """Let the planner know the cost of the cell at `position` has been
+        changed in the int map, e.g. with set_cell_value(..., str_map=False)."""
+        s = self.index(position)
+        self.costs[s] = self.map.get_cell_value(position)
+        self.updateVertex(s) # The cost of entering s has changed
+        for n in neighborIndices(s, self.rows, self.cols):
+            self.updateVertex(n) # s may have become or stopped being a wall
+
+    def setCellValue(self, position, value):
+        """Change the cost of a cell in the map and in the planner."""
+        self.map.set_cell_value(position, value, str_map=False)
+        self.cellChanged(position)
+
+    def replan(self):
+        """Follow the goal of the map, repair the search tree and return
+        (path, cost), where the path goes from the start to the goal (both
+        included), or None if the goal can not be reached."""
+        goalPos = self.map.get_goal_pos()
+        if self.index(goalPos) != self.goal:
+            self.moveGoal(goalPos)
+        self.computeShortestPath()
+        if self.g[self.goal] == float('inf'):
+            return None
+
+        # Walk back from the goal through the neighbor with the lowest g
+        path = [self.position(self.goal)]
+        current = self.goal
+        while current != self.start:
+            current = min((n for n in neighborIndices(current, self.rows, self.cols) if self.costs[n] > 0),
+                          key=lambda n: self.g[n])
+            path.append(self.position(current))
+        return path[::-1], self.g[self.goal]
+
+
+if __name__ == '__main__':
+    import Map
+
+    map_obj = Map.Map_Obj(task=5)
+    planner = DStarLite(map_obj)
+    while True:
+        result = planner.replan()
+        print("Tick %d: goal %s, cost %s, expanded %d" % (map_obj.tick_counter, map_obj.get_goal_pos(),
+                                                         result[1] if result else None, planner.expanded))
+        if map_obj.get_goal_pos() == map_obj.get_end_goal_pos():
+            break
+        map_obj.tick()
@@ -0,0 +1,105 @@
+import heapq
+from AStarSearch import neighborIndices
+from Landmarks import dijkstraField
+
+def costToGoField(map_obj, targets):
+    """Cost of the cheapest path from every cell to the nearest of
+    `targets` (a list of [x, y]), as an array shaped like the int map.
+    One multi-source Dijkstra on the reversed moves instead of one search
+    per target. Walls and cells that can not reach a target get inf."""
+    rows, cols = map_obj.int_map.shape
+    sources = [x * cols + y for x, y in targets]
+    return dijkstraField(map_obj.int_map.ravel().tolist(), rows, cols, sources, reverse=True).reshape(rows, cols)
+
+def costFromField(map_obj, sources):
+    """Cost of the cheapest path from the nearest of `sources` to every
+    cell, as an array shaped like the int map."""
+    rows, cols = map_obj.int_map.shape
+    indices = [x * cols + y for x, y in sources]
+    return dijkstraField(map_obj.int_map.ravel().tolist(), rows, cols, indices).reshape(rows, cols)
+
+def nearestTarget(map_obj, start_pos, targets):
+    """Find which of `targets` is cheapest to reach from `start_pos`.
+    Dijkstra from the start stops as soon as the first target is settled.
+    Returns (target, path, cost), where path goes from the start to the
+    target (both included), or None if no target can be reached."""
+    rows, cols = map_obj.int_map.shape
+    costs = map_obj.int_map.ravel().tolist()
+    start = start_pos[0] * cols + start_pos[1]
+    goals = {x * cols + y for x, y in targets}
+
+    dist = {start: 0}
+    cameFrom = {start: None}
+    frontier = [(0, start)]
+    while frontier:
+        d, current = heapq.heappop(frontier)
+        if d > dist[current]: # Outdated entry
+            continue
+        if current in goals:
+            path = [current]
+            while cameFrom[path[-1]] is not None:
+                path.append(cameFrom[path[-1]])
+            return list(divmod(current, cols)), [list(divmod(s, cols)) for s in reversed(path)], d
+        for neighbor in neighborIndices(current, rows, cols):
+            if costs[neighbor] <= 0: # Walls are not possible moves
+                continue
+            cost = d + costs[neighbor]
+            if cost < dist.get(neighbor, float('inf')):
+                dist[neighbor] = cost
+                cameFrom[neighbor] = current
+                heapq.heappush(frontier, (cost, neighbor))
+    return None # No target can be reached
+
+class DistanceFields:
+    """Cache of cost-to-go fields for a Map_Obj. The first query for a set
+    of targets computes the field, later queries are array lookups. The
+    cache is cleared when Map_Obj.version changes."""
+    def __init__(self, map_obj):
+        self.map = map_obj
+        self.version = map_obj.version
+        self.fields = {} # frozenset of target tuples -> cost-to-go field
+
+    def costToGo(self, targets):
+        """The cached costToGoField for `targets`."""
+        if self.version != self.map.version: # Costs have changed, every field is outdated
+            self.fields = {}
+            self.version = self.map.version
+        key = frozenset(tuple(target) for target in targets)
+        if key not in self.fields:
+            self.fields[key] = costToGoField(self.map, [list(target) for target in key])
+        return self.fields[key]
+
+    def cost(self, position, targets):
+        """Cost from `position` to the nearest of `targets`."""
+        return self.costToGo(targets)[position[0], position[1]]
+
+    def pathToNearest(self, position, targets):
+        """Follow the field downhill from `position` to the nearest target.
+        Returns the path (both ends included), or None if no target can be
+        reached."""
+        field = self.costToGo(targets)
+        rows, cols = field.shape
+        if field[position[0], position[1]] == float('inf'):
+            return None
+        path = [list(position)]
+        x, y = position
+        while field[x, y] > 0:
+            # The next cell n on a cheapest path has field[n] = field[current] - value of n
+            for n in neighborIndices(x * cols + y, rows, cols):
+                nx, ny = divmod(n, cols)
+                if self.map.int_map[nx, ny] > 0 and field[nx, ny] + self.map.int_map[nx, ny] == field[x, y]:
+                    x, y = nx, ny
+                    break
+            path.append([x, y])
+        return path
+
+
+if __name__ == '__main__':
+    import Map
+
+    map_obj = Map.Map_Obj(task=4)
+    targets = [[6, 32], [40, 32], [8, 5]]
+    target, path, cost = nearestTarget(map_obj, map_obj.get_start_pos(), targets)
+    print("Nearest target %s, cost %d" % (target, cost))
+    fields = DistanceFields(map_obj)
+    print("Cost from the start to the nearest target: %d" % fields.cost(map_obj.get_start_pos(), targets))
@@ -0,0 +1,236 @@
+import heapq
+import itertools
+from AStarSearch import neighborIndices
+
+class HPAStar:
+    """Hierarchical pathfinding (HPA*) on top of a Map_Obj.
+
+    The int map is split into clusters of clusterSize x clusterSize cells.
+    Along the border between two clusters, every run of cells that are
+    passable on both sides is an entrance, and gets one transition (two
+    for long runs) in the abstract graph. Inside a cluster, the exact
+    costs between its transition cells are precomputed. A query connects
+    the start and the goal to the transitions of their clusters, searches
+    the small abstract graph, and only refines the segments of the
+    abstract path into cells. The paths are close to optimal, but not
+    always optimal, since only the transition cells can be used to cross
+    a border.
+
+    Cell edits go through setCellValue / cellChanged. They only mark the
+    cluster of the cell (and the border it sits on, if any) as dirty, and
+    dirty parts are rebuilt before the next query.
+    """
+    longEntrance = 6 # Entrances at least this long get a transition at both ends instead of one in the middle
+
+    def __init__(self, map_obj, clusterSize=10):
+        self.map = map_obj
+        self.rows, self.cols = map_obj.int_map.shape
+        self.costs = map_obj.int_map.ravel().tolist()
+        self.clusterSize = clusterSize
+        self.clusterRows = -(-self.rows // clusterSize)
+        self.clusterCols = -(-self.cols // clusterSize)
+
+        self.borders = {} # Border key -> list of (a, b) transitions, a and b are adjacent cells on each side
+        self.inter = {} # Transition cell -> list of (cell on the other side, cost)
+        self.intra = {} # Cluster -> {transition cell: list of (transition cell, cost)}
+        self.dirtyBorders = set(self.allBorders())
+        self.dirtyClusters = {(cr, cc) for cr in range(self.clusterRows) for cc in range(self.clusterCols)}
+        self.rebuild()
+
+    def cluster(self, index): # Flat index -> (cluster row, cluster col)
+        x, y = divmod(index, self.cols)
+        return x // self.clusterSize, y // self.clusterSize
+
+    def allBorders(self):
+        # ('h', cr, cc) is the border below cluster (cr, cc), ('v', cr, cc) the border to its right
+        for cr in range(self.clusterRows):
+            for cc in range(self.clusterCols):
+                if cr + 1 < self.clusterRows:
+                    yield ('h', cr, cc)
+                if cc + 1 < self.clusterCols:
+                    yield ('v', cr, cc)
+
+    def borderClusters(self, border): # The two clusters on each side of a border
+        kind, cr, cc = border
+        return [(cr, cc), (cr + 1, cc) if kind == 'h' else (cr, cc + 1)]
+
+    def bordersOf(self, cluster): # The up to four borders around a cluster
+        cr, cc = cluster
+        borders = [('h', cr, cc), ('v', cr, cc), ('h', cr - 1, cc), ('v', cr, cc - 1)]
+        return [b for b in borders if 0 <= b[1] and 0 <= b[2] and
+                (b[0] != 'h' or b[1] + 1 < self.clusterRows) and (b[0] != 'v' or b[2] + 1 < self.clusterCols)]
+
+    def findTransitions(self, border):
+        kind, cr, cc = border
+        size = self.clusterSize
+        if kind == 'h': # Cells in the last row of the upper cluster and the first row of the lower one
+            x = (cr + 1) * size - 1
+            pairs = [(x * self.cols + y, (x + 1) * self.cols + y)
+                     for y in range(cc * size, min((cc + 1) * size, self.cols))]
+        else: # Cells in the last column of the left cluster and the first column of the right one
+            y = (cc + 1) * size - 1
+            pairs = [(x * self.cols + y, x * self.cols + y + 1)
+                     for x in range(cr * size, min((cr + 1) * size, self.rows))]
+
+        transitions = []
+        run = []
+        for a, b in pairs + [(None, None)]: # The sentinel closes the last run
+            if a is not None and self.costs[a] > 0 and self.costs[b] > 0:
+                run.append((a, b))
+                continue
+            if len(run) >= self.longEntrance:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        return transitions
+
+    def clusterSearch(self, source, cluster, reverse=False):
+        """Dijkstra from `source` that never leaves `cluster`. Returns the
+        costs and the parents of the cells reached. With reverse=True the
+        costs are from each cell to `source` instead."""
+        dist = {source: 0}
+        cameFrom = {source: None}
+        frontier = [(0, source)]
+        while frontier:
+            d, current = heapq.heappop(frontier)
+            if d > dist[current]:
+                continue
+            for neighbor in neighborIndices(current, self.rows, self.cols):
+                if self.costs[neighbor] <= 0 or self.cluster(neighbor) != cluster:
+                    continue
+                cost = d + (self.costs[current] if reverse else self.costs[neighbor])
+                if cost < dist.get(neighbor, float('inf')):
+                    dist[neighbor] = cost
+                    cameFrom[neighbor] = current
+                    heapq.heappush(frontier, (cost, neighbor))
+        return dist, cameFrom
+
+    def rebuild(self):
+        """Rebuild the dirty borders and clusters."""
+        if not self.dirtyBorders and not self.dirtyClusters:
+            return
+        for border in self.dirtyBorders:
+            self.borders[border] = self.findTransitions(border)
+            self.dirtyClusters.update(self.borderClusters(border))
+        self.dirtyBorders.clear()
+
+        self.inter = {}
+        for transitions in self.borders.values():
+            for a, b in transitions:
+                self.inter.setdefault(a, []).append((b, self.costs[b]))
+                self.inter.setdefault(b, []).append((a, self.costs[a]))
+
+        for cluster in self.dirtyClusters:
+            nodes = {cell for border in self.bordersOf(cluster) for pair in self.borders[border]
+                     for cell in pair if self.cluster(cell) == cluster}
+            edges = {}
+            for node in nodes:
+                dist, _ = self.clusterSearch(node, cluster)
+                edges[node] = [(other, dist[other]) for other in nodes if other != node and other in dist]
+            self.intra[cluster] = edges
+        self.dirtyClusters.clear()
+
+    def cellChanged(self, position):
+        """Let the layer know the cost of the cell at `position` has been
+        changed in the int map. Only the clusters touching the cell are
+        invalidated."""
+        index = position[0] * self.cols + position[1]
+        self.costs[index] = self.map.get_cell_value(position)
+        cluster = self.cluster(index)
+        self.dirtyClusters.add(cluster)
+        x, y = position
+        size = self.clusterSize
+        cr, cc = cluster
+        if x % size == 0 and cr > 0:
+            self.dirtyBorders.add(('h', cr - 1, cc))
+        if x % size == size - 1 and cr + 1 < self.clusterRows:
+            self.dirtyBorders.add(('h', cr, cc))
+        if y % size == 0 and cc > 0:
+            self.dirtyBorders.add(('v', cr, cc - 1))
+        if y % size == size - 1 and cc + 1 < self.clusterCols:
+            self.dirtyBorders.add(('v', cr, cc))
+
+    def setCellValue(self, position, value):
+        """Change the cost of a cell in the map and in the layer."""
+        self.map.set_cell_value(position, value, str_map=False)
+        self.cellChanged(position)
+
+    def search(self, start_pos, goal_pos):
+        """Returns (path, cost), where path is the list of positions from
+        start to goal (both included), or None if no path is found."""
+        self.rebuild()
+        start = start_pos[0] * self.cols + start_pos[1]
+        goal = goal_pos[0] * self.cols + goal_pos[1]
+        startCluster, goalCluster = self.cluster(start), self.cluster(goal)
+        fromStart, _ = self.clusterSearch(start, startCluster)
+        toGoal, _ = self.clusterSearch(goal, goalCluster, reverse=True)
+        startNodes = self.intra[startCluster]
+        goalNodes = self.intra[goalCluster]
+        goalX, goalY = divmod(goal, self.cols)
+
+        def neighbors(u): # Abstract graph edges, with the start and goal connected to their clusters
+            edges = list(self.intra[self.cluster(u)].get(u, [])) + self.inter.get(u, [])
+            if u == start:
+                edges += [(node, fromStart[node]) for node in startNodes if node in fromStart]
+                if goal in fromStart:
+                    edges.append((goal, fromStart[goal]))
+            if u in toGoal and u != goal and (u in goalNodes or u == start):
+                edges.append((goal, toGoal[u]))
+            return edges
+
+        # A* on the abstract graph
+        g = {start: 0}
+        cameFrom = {start: None}
+        counter = itertools.count()
+        frontier = [(0, next(counter), start)]
+        closed = set()
+        while frontier:
+            _, _, current = heapq.heappop(frontier)
+            if current in closed:
+                continue
+            if current == goal:
+                break
+            closed.add(current)
+            for neighbor, edgeCost in neighbors(current):
+                cost = g[current] + edgeCost
+                if cost < g.get(neighbor, float('inf')):
+                    g[neighbor] = cost
+                    cameFrom[neighbor] = current
+                    x, y = divmod(neighbor, self.cols)
+                    heapq.heappush(frontier, (cost + abs(x - goalX) + abs(y - goalY), next(counter), neighbor))
+        if goal not in g:
+            return None # No path found
+
+        abstractPath = [goal]
+        while cameFrom[abstractPath[-1]] is not None:
+            abstractPath.append(cameFrom[abstractPath[-1]])
+        abstractPath.reverse()
+        return self.refine(abstractPath), g[goal]
+
+    def refine(self, abstractPath):
+        # Turn the abstract path into cells. Steps across a border are already
+        # adjacent cells, steps inside a cluster are searched inside that cluster only.
+        path = [list(divmod(abstractPath[0], self.cols))]
+        for a, b in zip(abstractPath, abstractPath[1:]):
+            if self.cluster(a) != self.cluster(b):
+                segment = [b]
+            else:
+                _, cameFrom = self.clusterSearch(a, self.cluster(a))
+                segment = [b]
+                while cameFrom[segment[-1]] != a:
+                    segment.append(cameFrom[segment[-1]])
+                segment.reverse()
+            path += [list(divmod(cell, self.cols)) for cell in segment]
+        return path
+
+
+if __name__ == '__main__':
+    import Map
+    import AStarSearch
+
+    for task in range(1, 5):
+        map_obj = Map.Map_Obj(task=task)
+        result = HPAStar(map_obj).search(map_obj.get_start_pos(), map_obj.get_goal_pos())
+        optimal = AStarSearch.GridSearch(map_obj).search(map_obj.get_start_pos(), map_obj.get_goal_pos())
+        print("Task %d: cost %d with HPA*, %d optimal" % (task, result[1], optimal[1]))
@@ -0,0 +1,97 @@
+import heapq
+import itertools
+from AStarSearch import neighborIndices
+
+def nextGoalPos(goal_pos, end_goal_pos): # Same move as Map_Obj.pick_move, without changing the map
+    if goal_pos[0] < end_goal_pos[0]:
+        return [goal_pos[0] + 1, goal_pos[1]]
+    elif goal_pos[0] > end_goal_pos[0]:
+        return [goal_pos[0] - 1, goal_pos[1]]
+    elif goal_pos[1] < end_goal_pos[1]:
+        return [goal_pos[0], goal_pos[1] + 1]
+    else:
+        return [goal_pos[0], goal_pos[1] - 1]
+
+def goalTrajectory(map_obj, horizon):
+    """Predict where the goal is after 0, 1, ..., horizon calls to
+    Map_Obj.tick, by replaying the same rules (one step towards
+    end_goal_pos every 4th tick) on a copy of the state."""
+    goal_pos = list(map_obj.get_goal_pos())
+    end_goal_pos = map_obj.get_end_goal_pos()
+    tick_counter = map_obj.tick_counter
+    trajectory = [goal_pos]
+    for _ in range(horizon):
+        if tick_counter % 4 == 0:
+            if end_goal_pos is None or end_goal_pos == goal_pos: # The goal has stopped for good
+                trajectory.extend([goal_pos] * (horizon + 1 - len(trajectory)))
+                break
+            goal_pos = nextGoalPos(goal_pos, end_goal_pos)
+        tick_counter += 1
+        trajectory.append(goal_pos)
+    return trajectory
+
+def defaultHorizon(map_obj): # Enough ticks for the goal to stop, and then to cross the map once
+    rows, cols = map_obj.int_map.shape
+    goal_pos, end_goal_pos = map_obj.get_goal_pos(), map_obj.get_end_goal_pos()
+    moves = 0 if end_goal_pos is None else abs(goal_pos[0] - end_goal_pos[0]) + abs(goal_pos[1] - end_goal_pos[1])
+    return 4 * moves + rows + cols
+
+def interceptSearch(map_obj, horizon=None, allowWait=True):
+    """Find the cheapest way to meet the moving goal, searching in
+    (cell, tick) space. Every tick the agent moves to a neighbor, paying
+    its cell value, or (if allowWait) stays, paying the value of the cell
+    it is in. The goal moves as Map_Obj.tick would move it. Only ticks up
+    to `horizon` are searched, so at most rows * cols * (horizon + 1)
+    states are ever stored.
+
+    Returns (path, interceptTick, cost), where path[t] is the position of
+    the agent at tick t, or None if the goal can not be met within the
+    horizon.
+    """
+    if horizon is None:
+        horizon = defaultHorizon(map_obj)
+    rows, cols = map_obj.int_map.shape
+    size = rows * cols
+    costs = map_obj.int_map.ravel().tolist()
+    trajectory = [pos[0] * cols + pos[1] for pos in goalTrajectory(map_obj, horizon)]
+    start = map_obj.get_start_pos()[0] * cols + map_obj.get_start_pos()[1]
+
+    g = {start: 0} # State (tick * size + cell) -> cost, only for the states reached
+    cameFrom = {start: None}
+    counter = itertools.count()
+    frontier = [(0, next(counter), start)]
+    while frontier:
+        cost, _, state = heapq.heappop(frontier)
+        if cost > g[state]: # Outdated entry
+            continue
+        tick, cell = divmod(state, size)
+        if cell == trajectory[tick]: # Uniform cost order, so the first meeting is the cheapest
+            path = []
+            while state is not None:
+                path.append(list(divmod(state % size, cols)))
+                state = cameFrom[state]
+            return path[::-1], tick, cost
+        if tick == horizon:
+            continue
+
+        moves = list(neighborIndices(cell, rows, cols))
+        if allowWait:
+            moves.append(cell)
+        for nextCell in moves:
+            if costs[nextCell] <= 0: # Walls are not possible moves
+                continue
+            nextState = (tick + 1) * size + nextCell
+            nextCost = cost + costs[nextCell]
+            if nextCost < g.get(nextState, float('inf')):
+                g[nextState] = nextCost
+                cameFrom[nextState] = state
+                heapq.heappush(frontier, (nextCost, next(counter), nextState))
+    return None # The goal can not be met within the horizon
+
+
+if __name__ == '__main__':
+    import Map
+
+    map_obj = Map.Map_Obj(task=5)
+    path, interceptTick, cost = interceptSearch(map_obj)
+    print("Intercept at tick %d in %s, cost %d" % (interceptTick, path[-1], cost))
@@ -0,0 +1,228 @@
+import heapq
+import itertools
+import numpy as np
+
+def shifted(a, dx, dy, fill): # b[x, y] = a[x + dx, y + dy], or fill where that is outside the map
+    b = np.full_like(a, fill)
+    rows, cols = a.shape
+    b[max(0, -dx):rows - max(0, dx), max(0, -dy):cols - max(0, dy)] = \
+        a[max(0, dx):rows - max(0, -dx), max(0, dy):cols - max(0, -dy)]
+    return b
+
+def nextEvent(events, axis, forward):
+    """For every cell, the index along `axis` of the first cell after it
+    (in the direction of the jump) where `events` is True. Where there is
+    none, the index just outside the map is used (-1 or the length)."""
+    events = events if axis == 1 else events.T
+    n = events.shape[1]
+    positions = np.arange(n)
+    if forward:
+        atOrAfter = np.minimum.accumulate(np.where(events, positions, n)[:, ::-1], axis=1)[:, ::-1]
+        after = np.full_like(atOrAfter, n)
+        after[:, :-1] = atOrAfter[:, 1:]
+    else:
+        atOrBefore = np.maximum.accumulate(np.where(events, positions, -1), axis=1)
+        after = np.full_like(atOrBefore, -1)
+        after[:, 1:] = atOrBefore[:, :-1]
+    return after if axis == 1 else after.T
+
+class JumpPointSearch:
+    """Jump Point Search for the 4-connected moves of getNeighbors.
+
+    A jump moves in a straight line and only stops at a jump point: the
+    goal, a boundary cell (a cell with a passable neighbor of another
+    cost), or a cell with a forced neighbor. A side neighbor is forced
+    when it has the same cost as the cell, while the side neighbor of the
+    previous cell does not (it is a wall, outside the map or another
+    cost), so the region opens up there. A vertical jump also stops where
+    a horizontal jump to either side would reach a jump point. Boundary
+    cells are expanded in all four directions, so cost changes are
+    handled like in plain A*. Other jump points are expanded forwards and
+    to both sides. Inside a region of one cost every path between two
+    cells with the same number of steps costs the same, so the cells
+    jumped over are never pushed on the frontier.
+
+    Where every jump from every cell ends (apart from the goal) does not
+    depend on the query, so it is computed once for the whole map with
+    numpy, and every jump is a table lookup. The costs are the same as
+    with aStarSearch, but when several paths have the same cost another
+    one may be returned, since jumps go as far as they can in a straight
+    line before turning.
+    """
+    def __init__(self, map_obj):
+        costs = np.asarray(map_obj.int_map, dtype=np.int64)
+        self.rows, self.cols = costs.shape
+        passable = costs > 0
+        directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+        around = {d: shifted(costs, d[0], d[1], -1) for d in directions} # Cost of the neighbor in each direction, -1 outside the map
+        boundary = passable & np.logical_or.reduce([(around[d] > 0) & (around[d] != costs) for d in directions])
+
+        def forced(d): # Cells where a jump moving in direction d has a forced side neighbor
+            result = np.zeros_like(passable)
+            for side in [(d[1], d[0]), (-d[1], -d[0])]:
+                result |= (around[side] == costs) & (shifted(costs, side[0] - d[0], side[1] - d[1], -1) != costs)
+            return passable & result
+
+        def reaches(end, axis): # True where a jump ending at `end` along `axis` ends on a cell of the map that is passable
+            inside = (end >= 0) & (end < passable.shape[axis])
+            return inside & np.take_along_axis(passable, np.clip(end, 0, passable.shape[axis] - 1), axis=axis)
+
+        right = nextEvent(~passable | boundary | forced((0, 1)), 1, True)
+        left = nextEvent(~passable | boundary | forced((0, -1)), 1, False)
+        probe = reaches(right, 1) | reaches(left, 1) # A horizontal jump from the cell reaches a jump point
+        down = nextEvent(~passable | boundary | forced((1, 0)) | probe, 0, True)
+        up = nextEvent(~passable | boundary | forced((-1, 0)) | probe, 0, False)
+
+        # Where a jump from every cell in every direction ends, as the row (vertical) or column (horizontal)
+        self.ends = {(0, 1): right.ravel().tolist(), (0, -1): left.ravel().tolist(),
+                     (1, 0): down.ravel().tolist(), (-1, 0): up.ravel().tolist()}
+        self.passable = passable.ravel().tolist()
+        self.boundary = boundary.ravel().tolist()
+        # Sums of the costs before every column (of a row) and row (of a column), to get the cost of a jump
+        walls = np.where(passable, costs, 0)
+        self.rowSums = np.concatenate([np.zeros((self.rows, 1), dtype=np.int64), walls.cumsum(axis=1)], axis=1).tolist()
+        self.colSums = np.concatenate([np.zeros((self.cols, 1), dtype=np.int64), walls.T.cumsum(axis=1)], axis=1).tolist()
+
+    def reachesGoal(self, x, y, goalY): # A horizontal jump from [x, y] passes the goal in row x
+        index = x * self.cols + y
+        return goalY == y or y < goalY <= self.ends[(0, 1)][index] or self.ends[(0, -1)][index] <= goalY < y
+
+    def jump(self, index, direction, goalX, goalY):
+        """Jump from `index` in `direction`. Returns (jump point, cost of the
+        cells entered on the way) or None."""
+        x, y = divmod(index, self.cols)
+        end = self.ends[direction][index]
+        if direction[0] == 0: # Horizontal
+            if x == goalX and (y < goalY <= end or end <= goalY < y):
+                end = goalY
+            elif not 0 <= end < self.cols or not self.passable[x * self.cols + end]:
+                return None
+            sums, start = self.rowSums[x], y
+            jumpPoint = x * self.cols + end
+        else:
+            if (x < goalX < end or end < goalX < x) and self.reachesGoal(goalX, y, goalY):
+                end = goalX
+            elif not 0 <= end < self.rows or not self.passable[end * self.cols + y]:
+                return None
+            sums, start = self.colSums[y], x
+            jumpPoint = end * self.cols + y
+        # The cells entered are the ones after start, up to and including end
+        return jumpPoint, sums[end + 1] - sums[start + 1] if end > start else sums[start] - sums[end]
+
+    def successorDirections(self, index, direction):
+        if direction is None or self.boundary[index]: # Start or boundary cell, expand everything
+            return [(1, 0), (0, 1), (-1, 0), (0, -1)]
+        if direction[0] != 0: # Keep going, or turn to either side
+            return [direction, (0, 1), (0, -1)]
+        return [direction, (1, 0), (-1, 0)]
+
+    def search(self, start_pos, goal_pos, stats=None):
+        """Returns (path, cost), where path is the list of positions from
+        start to goal (both included), or None if no path is found. If a
+        stats dict is given, the expanded jump points and the heap pushes
+        and pops are counted in it."""
+        if stats is None:
+            stats = {}
+        for key in ('expanded', 'pushes', 'pops'):
+            stats.setdefault(key, 0)
+        start = start_pos[0] * self.cols + start_pos[1]
+        goal = goal_pos[0] * self.cols + goal_pos[1]
+        goalX, goalY = divmod(goal, self.cols)
+
+        g = {start: 0}
+        cameFrom = {start: None}
+        direction = {start: None} # Direction of the jump that reached each jump point
+        closed = set()
+        counter = itertools.count()
+        frontier = [(0, next(counter), start)]
+        stats['pushes'] += 1
+        while frontier:
+            _, _, current = heapq.heappop(frontier)
+            stats['pops'] += 1
+            if current in closed:
+                continue
+            if current == goal:
+                return self.reconstruct(cameFrom, goal), g[goal]
+            closed.add(current)
+            stats['expanded'] += 1
+
+            for d in self.successorDirections(current, direction[current]):
+                found = self.jump(current, d, goalX, goalY)
+                if found is None:
+                    continue
+                jumpPoint, jumpCost = found
+                cost = g[current] + jumpCost
+                if cost < g.get(jumpPoint, float('inf')):
+                    g[jumpPoint] = cost
+                    cameFrom[jumpPoint] = current
+                    direction[jumpPoint] = d
+                    x, y = divmod(jumpPoint, self.cols)
+                    heapq.heappush(frontier, (cost + abs(x - goalX) + abs(y - goalY), next(counter), jumpPoint))
+                    stats['pushes'] += 1
+        return None # No path found
+
+    def reconstruct(self, cameFrom, goal): # Fill in the straight lines between the jump points
+        path = [list(divmod(goal, self.cols))]
+        current = goal
+        while cameFrom[current] is not None:
+            parent = cameFrom[current]
+            x, y = divmod(current, self.cols)
+            px, py = divmod(parent, self.cols)
+            dx, dy = (px > x) - (px < x), (py > y) - (py < y)
+            while [x, y] != [px, py]:
+                x, y = x + dx, y + dy
+                path.append([x, y])
+            current = parent
+        return path[::-1]
+
+
+if __name__ == '__main__':
+    # Heap pops and wall time of JPS, aStarSearch and GridSearch on the
+    # Samfundet tasks and on generated 200x200 maps (seed 0)
+    import contextlib
+    import io
+    import os
+    import time
+    import Map
+    import AStarSearch
+    from MapGenerator import generateMap, writeMap
+
+    size = 200
+    os.makedirs('generated_maps', exist_ok=True)
+    corners = ([0, 0], [size - 1, size - 1])
+    writeMap(np.ones((size, size), dtype=int), os.path.join('generated_maps', 'empty_%d.csv' % size))
+    twoCost = np.ones((size, size), dtype=int)
+    twoCost[:, size // 2:] = 2
+    writeMap(twoCost, os.path.join('generated_maps', 'twocost_%d.csv' % size))
+    maps = [('task %d' % task, lambda task=task: Map.Map_Obj(task=task)) for task in range(1, 6)]
+    maps += [('empty %d' % size, lambda: Map.Map_Obj.from_file(os.path.join('generated_maps', 'empty_%d.csv' % size), *corners)),
+             ('two-cost %d' % size, lambda: Map.Map_Obj.from_file(os.path.join('generated_maps', 'twocost_%d.csv' % size), *corners))]
+    for kind in ('open', 'maze'):
+        maps.append(('%s %d' % (kind, size), lambda kind=kind: Map.Map_Obj.from_file(*generateMap(kind, size))))
+
+    print("%-13s %5s | %8s %9s %9s | %8s %9s | %9s" % ('map', 'cost', 'JPS pops', 'build ms', 'search ms',
+                                                      'A* pops', 'A* ms', 'Grid ms'))
+    for name, load in maps:
+        map_obj = load()
+        start, goal = map_obj.get_start_pos(), map_obj.get_goal_pos()
+        startTime = time.perf_counter()
+        jps = JumpPointSearch(map_obj)
+        built = time.perf_counter()
+        jpsStats = {}
+        _, cost = jps.search(start, goal, jpsStats)
+        searched = time.perf_counter()
+
+        astar = AStarSearch.newSearchStats()
+        with contextlib.redirect_stdout(io.StringIO()): # aStarSearch prints the cost
+            AStarSearch.aStarSearch(load(), stats=astar)
+        astarSeconds = astar['buildSeconds'] + astar['searchSeconds'] + astar['reconstructSeconds']
+
+        grid = AStarSearch.GridSearch(map_obj)
+        gridStart = time.perf_counter()
+        _, gridCost = grid.search(start, goal)
+        gridSeconds = time.perf_counter() - gridStart
+        assert cost == gridCost
+
+        print("%-13s %5d | %8d %9.2f %9.2f | %8d %9.2f | %9.2f" % (
+            name, cost, jpsStats['pops'], (built - startTime) * 1000, (searched - built) * 1000,
+            astar['pops'], astarSeconds * 1000, gridSeconds * 1000))
@@ -0,0 +1,119 @@
+import heapq
+import os
+import numpy as np
+from AStarSearch import neighborIndices, heuristic_manhattan
+
+def dijkstraField(costs, rows, cols, sources, reverse=False):
+    """Exact cost from the closest of `sources` to every cell, where moving
+    into a cell costs its value. With reverse=True it is instead the cost
+    from every cell to the closest source. `costs` is the flat cost map
+    and sources are flat indices. Unreachable cells and walls get inf."""
+    dist = [float('inf')] * (rows * cols)
+    frontier = []
+    for source in sources:
+        dist[source] = 0
+        frontier.append((0, source))
+    heapq.heapify(frontier)
+    while frontier:
+        d, current = heapq.heappop(frontier)
+        if d > dist[current]: # Outdated entry
+            continue
+        for neighbor in neighborIndices(current, rows, cols):
+            if costs[neighbor] <= 0: # Walls are not possible moves
+                continue
+            # Forward we pay for entering the neighbor, backward the move goes neighbor -> current
+            cost = d + (costs[current] if reverse else costs[neighbor])
+            if cost < dist[neighbor]:
+                dist[neighbor] = cost
+                heapq.heappush(frontier, (cost, neighbor))
+    return np.array(dist)
+
+class Landmarks:
+    """ALT (A*, landmarks and triangle inequality) preprocessing of a
+    Map_Obj.
+
+    K landmarks are picked far apart from each other, and for each one the
+    exact cost from it (fromLandmark) and to it (toLandmark) is stored for
+    every cell. Since moving into a cell costs the value of that cell,
+    the costs are not symmetric, so both directions are needed. For any
+    landmark L the triangle inequality gives the lower bounds
+    d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) - d(t, L).
+    """
+    def __init__(self, map_obj, k=4, cache=True):
+        """Pick `k` landmarks and compute their distance fields. With
+        cache=True the fields are saved next to the map CSV and loaded
+        from there next time, as long as the map and k are the same."""
+        self.rows, self.cols = map_obj.int_map.shape
+        self.costs = map_obj.int_map.ravel()
+        self.goalFields = {} # Goal index -> heuristic for every cell towards that goal
+
+        path = os.path.splitext(map_obj.path_to_map)[0] + '.landmarks%d.npz' % k
+        if cache and os.path.exists(path):
+            saved = np.load(path)
+            if np.array_equal(saved['costs'], self.costs):
+                self.landmarks = saved['landmarks']
+                self.fromLandmark = saved['fromLandmark']
+                self.toLandmark = saved['toLandmark']
+                return
+
+        self.landmarks, self.fromLandmark, self.toLandmark = self.pickLandmarks(k)
+        if cache:
+            np.savez(path, costs=self.costs, landmarks=self.landmarks,
+                     fromLandmark=self.fromLandmark, toLandmark=self.toLandmark)
+
+    def pickLandmarks(self, k):
+        # Farthest point selection: start in the first passable cell, then
+        # repeatedly add the cell farthest from all the landmarks so far
+        costs = self.costs.tolist()
+        passable = np.flatnonzero(self.costs > 0)
+        landmarks, fromFields, toFields = [], [], []
+        closest = np.full(self.rows * self.cols, np.inf) # Distance to the nearest landmark so far
+        candidate = int(passable[0])
+        for _ in range(k):
+            fromField = dijkstraField(costs, self.rows, self.cols, [candidate])
+            landmarks.append(candidate)
+            fromFields.append(fromField)
+            toFields.append(dijkstraField(costs, self.rows, self.cols, [candidate], reverse=True))
+            closest = np.minimum(closest, fromField)
+            reachable = np.where(np.isfinite(closest), closest, -1)
+            candidate = int(np.argmax(reachable))
+        return np.array(landmarks), np.array(fromFields), np.array(toFields)
+
+    def fieldTo(self, goal):
+        """The ALT lower bound from every cell to the flat index `goal`, as
+        one numpy array. Landmarks that can not reach both cells are left
+        out, and walls get 0."""
+        if goal not in self.goalFields:
+            with np.errstate(invalid='ignore'): # inf - inf for unreachable cells
+                forward = self.fromLandmark[:, goal:goal + 1] - self.fromLandmark
+                backward = self.toLandmark - self.toLandmark[:, goal:goal + 1]
+            bounds = np.maximum(np.nan_to_num(forward, nan=0, posinf=0, neginf=0),
+                                np.nan_to_num(backward, nan=0, posinf=0, neginf=0))
+            self.goalFields[goal] = np.maximum(bounds.max(axis=0), 0).tolist()
+        return self.goalFields[goal]
+
+    def heuristic(self, curr, goalNode):
+        """Heuristic for AStarSearch.aStarSearch(map, heuristic=...). It is the
+        largest of the landmark bounds and the manhattan distance, which
+        are all consistent, so the path stays optimal."""
+        field = self.fieldTo(goalNode.position[0] * self.cols + goalNode.position[1])
+        return max(field[curr.position[0] * self.cols + curr.position[1]],
+                   heuristic_manhattan(curr, goalNode))
+
+
+if __name__ == '__main__':
+    import contextlib
+    import io
+    import Map
+    import AStarSearch
+
+    for task in range(1, 6):
+        manhattan = AStarSearch.newSearchStats()
+        alt = AStarSearch.newSearchStats()
+        with contextlib.redirect_stdout(io.StringIO()): # aStarSearch prints the cost
+            AStarSearch.aStarSearch(Map.Map_Obj(task=task), stats=manhattan)
+            map_obj = Map.Map_Obj(task=task)
+            AStarSearch.aStarSearch(map_obj, stats=alt, heuristic=Landmarks(map_obj).heuristic)
+        print("Task %d: %d expanded with manhattan, %d with landmarks (%.0f%% fewer)" % (
+            task, manhattan['expanded'], alt['expanded'],
+            100 * (1 - alt['expanded'] / manhattan['expanded'])))
@@ -1,5 +1,6 @@
+import os
+import tempfile
 import numpy as np
-import pandas as pd
 from PIL import Image
 from typing import Union
 
@@ -39,19 +40,67 @@ class Map_Obj():
         task : int, optional
             Number of map / task to solve, by default task 1
         """
+        self.init_map(*self.fill_critical_positions(task))
+
+    @classmethod
+    def from_file(cls, path_to_map: str, start_pos: list[int, int],
+                  goal_pos: list[int, int],
+                  end_goal_pos: list[int, int] = None) -> 'Map_Obj':
+        """Instantiate a map object for any map file, instead of one of
+        the tasks.
+
+        Parameters
+        ----------
+        path_to_map : str
+            Path to the map file (CSV)
+        start_pos : list[int, int]
+            Starting position
+        goal_pos : list[int, int]
+            Goal position
+        end_goal_pos : list[int, int], optional
+            End goal position for a moving goal, by default the goal
+            does not move
+        """
+        map_obj = cls.__new__(cls)
+        map_obj.init_map(list(start_pos), list(goal_pos),
+                         list(end_goal_pos or goal_pos), path_to_map)
+        return map_obj
+
+    def init_map(self, start_pos: list[int, int], goal_pos: list[int, int],
+                 end_goal_pos: list[int, int], path_to_map: str) -> None:
+        """Load the map at `path_to_map` and set up the positions"""
         self.start_pos, self.goal_pos, self.end_goal_pos, \
-            self.path_to_map = self.fill_critical_positions(task)
-        self.int_map, self.str_map = self.read_map(self.path_to_map)
+            self.path_to_map = start_pos, goal_pos, end_goal_pos, path_to_map
+        self.int_map = self.load_int_map(self.path_to_map)
+        self._str_map = None  # Built on first use, see str_map
         self.tmp_cell_value = self.get_cell_value(self.goal_pos)
-        self.set_cell_value(self.start_pos, ' S ')
-        self.set_cell_value(self.goal_pos, ' G ')
         self.tick_counter = 0
-
-    def read_map(self, path: str) -> tuple[np.ndarray, str]:
+        # Increased every time a cost in the integer map changes, so
+        # cached results for the map can tell they are outdated
+        self.version = 0
+
+    @property
+    def str_map(self) -> np.ndarray:
+        """The map as an array of symbols, with the start and goal
+        marked. It is only needed for printing and drawing, so it is
+        derived from the integer map the first time it is used."""
+        if self._str_map is None:
+            self._str_map = self.int_to_str_map(self.int_map)
+            self._str_map[self.start_pos[0], self.start_pos[1]] = ' S '
+            self._str_map[self.goal_pos[0], self.goal_pos[1]] = ' G '
+        return self._str_map
+
+    @str_map.setter
+    def str_map(self, value: np.ndarray):
+        self._str_map = value
+
+    def read_map(self, path: str) -> tuple[np.ndarray, np.ndarray]:
         """
         Reads maps specified in path from file, converts them to numpy
         array and a string array. Then replaces specific values in the
         string array with predefined values more suitable for printing.
+        Map_Obj itself uses load_int_map and only builds the string
+        array when str_map is first used.
 
         Parameters
         ----------
@@ -60,24 +109,84 @@ class Map_Obj():
 
         Returns
         -------
-        tuple[np.ndarray, str]
+        tuple[np.ndarray, np.ndarray]
             A tuple of the map as an ndarray of integers,
-            and the map as a string of symbols.
+            and the map as an array of symbols.
+        """
+        int_map = self.load_int_map(path)
+        return int_map, self.int_to_str_map(int_map)
+
+    def load_int_map(self, path: str) -> np.ndarray:
+        """
+        Reads the map specified in path. The CSV file is parsed once and
+        compiled to a .npy file next to it. Later loads memory-map the
+        compiled file instead, which is much faster than parsing the CSV.
+        The map is mapped copy-on-write, so it can still be changed in
+        memory without changing the file. The compiled file is rebuilt
+        if the CSV is newer. The values -1..4 are stored as int8, which
+        keeps the file of a 4000x4000 map at 16 MB, so a map is only
+        stored with a larger type if its values do not fit. If the
+        compiled file can not be written, e.g. in a read-only checkout,
+        the parsed CSV is used as it is.
+
+        Parameters
+        ----------
+        path : str
+            Path to the map file (CSV)
+
+        Returns
+        -------
+        np.ndarray
+            The map as an ndarray of integers
+        """
+        compiled = os.path.splitext(path)[0] + '.npy'
+        if not os.path.exists(compiled) or \
+                os.path.getmtime(compiled) < os.path.getmtime(path):
+            # Read map from provided csv file
+            data = np.loadtxt(path, delimiter=',', dtype=np.int64, ndmin=2)
+            if data.size == 0 or (data.min() >= -128 and data.max() <= 127):
+                data = data.astype(np.int8)
+            # Write to a temporary file first, so other processes never
+            # see a half written map
+            tmp_path = None
+            try:
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=os.path.dirname(os.path.abspath(compiled)), suffix='.npy')
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, data)
+                os.chmod(tmp_path, 0o644)  # mkstemp makes the file private
+                os.replace(tmp_path, compiled)
+            except OSError:
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return data
+        return np.load(compiled, mmap_mode='c')
+
+    @staticmethod
+    def int_to_str_map(data: np.ndarray) -> np.ndarray:
+        """
+        Converts an integer map to a string array, and replaces specific
+        values with predefined values more suitable for printing.
+
+        Parameters
+        ----------
+        data : np.ndarray
+            The map as an ndarray of integers
+
+        Returns
+        -------
+        np.ndarray
+            The map as an array of symbols
         """
-        # Read map from provided csv file
-        df = pd.read_csv(path, index_col=None,
-                         header=None)  # ,error_bad_lines=False)
-        # Convert pandas dataframe to numpy array
-        data = df.values
         # Convert numpy array to string to make it more human readable
-        data_str = data.astype(str)
+        data_str = np.asarray(data).astype(str)
         # Replace numeric values with more human readable symbols
         data_str[data_str == '-1'] = ' # '
         data_str[data_str == '1'] = ' . '
         data_str[data_str == '2'] = ' , '
         data_str[data_str == '3'] = ' : '
         data_str[data_str == '4'] = ' ; '
-        return data, data_str
+        return data_str
 
     def fill_critical_positions(self, task: int) -> tuple[list[int], list[int],
                                                           list[int], str]:
@@ -128,8 +237,9 @@ class Map_Obj():
         return start_pos, goal_pos, end_goal_pos, path_to_map
 
     def get_cell_value(self, pos: list[int, int]) -> int:
-        """Getter for the value (cost) of the cell at `pos`"""
-        return self.int_map[pos[0], pos[1]]
+        """Getter for the value (cost) of the cell at `pos`, as a Python
+        int, so sums of costs can not overflow the int8 map"""
+        return int(self.int_map[pos[0], pos[1]])
 
     def get_goal_pos(self) -> list[int, int]:
         """Getter for the goal position of the current task"""
@@ -143,7 +253,7 @@ class Map_Obj():
         """Getter for the end goal position of the moving task"""
         return self.end_goal_pos
 
-    def get_maps(self) -> tuple[np.ndarray, str]:
+    def get_maps(self) -> tuple[np.ndarray, np.ndarray]:
         """Getter for the maps in both integer and string form"""
         # Return the map in both int and string format
         return self.int_map, self.str_map
@@ -182,6 +292,8 @@ class Map_Obj():
         if str_map:
             self.str_map[pos[0], pos[1]] = value
         else:
+            if self.int_map[pos[0], pos[1]] != value:
+                self.version += 1
             self.int_map[pos[0], pos[1]] = value
 
     def print_map(self, map_to_print: Union[np.ndarray, str]):
@@ -231,9 +343,14 @@ class Map_Obj():
             str_value = ' ; '
         else:
             str_value = str(value)
+        if self.int_map[pos[0]][pos[1]] != value:
+            self.version += 1
         self.int_map[pos[0]][pos[1]] = value
-        self.str_map[pos[0]][pos[1]] = str_value
-        self.str_map[goal_pos[0], goal_pos[1]] = ' G '
+        # If the string map has not been built yet, it will be built from
+        # the updated integer map, so there is nothing to do
+        if self._str_map is not None:
+            self._str_map[pos[0]][pos[1]] = str_value
+            self._str_map[goal_pos[0], goal_pos[1]] = ' G '
 
     def tick(self) -> list[int, int]:
         """
@@ -302,13 +419,50 @@ class Map_Obj():
         else:
             themap[goal_pos[0]][goal_pos[1]] = ' G '
 
-    def show_map(self, themap: Union[np.ndarray, str] = None):
-        """Draws `themap` as an image and shows it.
+    # Define what colors to give to different values of the string map
+    # (undefined values are yellow, this is how the yellow path is painted)
+    colors = {
+        ' # ': (211, 33, 45),  # redish
+        ' . ': (215, 215, 215),  # whiteish
+        ' , ': (166, 166, 166),  # lightgrey
+        ' : ': (96, 96, 96),   # darkgrey
+        ' ; ': (36, 36, 36),   # blackish
+        ' S ': (255, 0, 255),  # magenta
+        ' G ': (0, 128, 255)   # cyan
+    }
+    path_color = (255, 255, 0)  # yellow
+
+    def map_to_cell_colors(self, themap: np.ndarray) -> np.ndarray:
+        """Look up the color of every cell of the string map `themap`.
+        Returns an array of shape (height, width, 3)."""
+        # Every distinct symbol is looked up once, then the colors are
+        # gathered for all cells in one go
+        symbols, inverse = np.unique(np.asarray(themap), return_inverse=True)
+        palette = np.array([self.colors.get(symbol, self.path_color)
+                            for symbol in symbols], dtype=np.uint8)
+        return palette[inverse.reshape(np.shape(themap))]
+
+    def upscale(self, cells: np.ndarray, scale: int) -> np.ndarray:
+        """Turn every cell of `cells` (shape (..., height, width, 3)) into
+        a `scale` x `scale` block of pixels."""
+        return cells.repeat(scale, axis=-3).repeat(scale, axis=-2)
+
+    def render_map(self, themap: Union[np.ndarray, str] = None,
+                   scale: int = 20) -> np.ndarray:
+        """Draws `themap` as an RGB image.
 
         Parameters
         ----------
         themap : np.ndarray or str, optional
-            The map to show. By default uses the string map
+            The map to draw. By default uses the string map
+        scale : int, optional
+            Size of every cell in pixels, by default 20
+
+        Returns
+        -------
+        np.ndarray
+            The image as an array of shape (height * scale,
+            width * scale, 3)
         """
         # If a map is provided, set the goal and start positions
         if themap is not None:
@@ -317,38 +471,82 @@ class Map_Obj():
         # If no map is provided, use string_map
         else:
             themap = self.str_map
+        return self.upscale(self.map_to_cell_colors(themap), scale)
+
+    def render_paths(self, paths: list[list[list[int]]],
+                     scale: int = 20) -> np.ndarray:
+        """Draws every path in `paths` in yellow on its own copy of the
+        string map. The map colors are only looked up once for the whole
+        batch.
+
+        Parameters
+        ----------
+        paths : list[list[list[int]]]
+            The paths to draw, each a list of [x, y] positions
+        scale : int, optional
+            Size of every cell in pixels, by default 20
+
+        Returns
+        -------
+        np.ndarray
+            The images as an array of shape (len(paths),
+            height * scale, width * scale, 3)
+        """
+        cells = self.map_to_cell_colors(self.str_map)
+        frames = np.repeat(cells[np.newaxis], len(paths), axis=0)
+        markers = (self.str_map == ' S ') | (self.str_map == ' G ')
+        for frame, path in zip(frames, paths):
+            if len(path) == 0:
+                continue
+            xs, ys = np.asarray(path).T
+            keep = ~markers[xs, ys]  # Do not paint over the start and goal
+            frame[xs[keep], ys[keep]] = self.path_color
+        return self.upscale(frames, scale)
+
+    def save_map(self, filename: str, themap: Union[np.ndarray, str] = None,
+                 scale: int = 20):
+        """Draws `themap` and writes it to `filename`, without opening a
+        viewer. The format is picked from the file extension (e.g. .png).
+        """
+        Image.fromarray(self.render_map(themap, scale)).save(filename)
 
-        # Define width and height of image
-        width = themap.shape[1]
-        height = themap.shape[0]
-        # Define scale of the image
-        scale = 20
-        # Create an all-yellow image
-        image = Image.new('RGB', (width * scale, height * scale),
-                          (255, 255, 0))
-        # Load image
-        pixels = image.load()
-
-        # Define what colors to give to different values of the string map
-        # (undefined values will remain yellow, this is
-        # how the yellow path is painted)
-        colors = {
-            ' # ': (211, 33, 45),  # redish
-            ' . ': (215, 215, 215),  # whiteish
-            ' , ': (166, 166, 166),  # lightgrey
-            ' : ': (96, 96, 96),   # darkgrey
-            ' ; ': (36, 36, 36),   # blackish
-            ' S ': (255, 0, 255),  # magenta
-            ' G ': (0, 128, 255)   # cyan
-        }
-        # Go through image and set pixel color for every position
-        for y in range(height):
-            for x in range(width):
-                if themap[y][x] not in colors:
-                    continue
-                for i in range(scale):
-                    for j in range(scale):
-                        pixels[x * scale + i,
-                               y * scale + j] = colors[themap[y][x]]
-        # Show image
-        image.show()
\ No newline at end of file
+    def save_frames(self, frames: np.ndarray, filename: str,
+                    duration: int = 100):
+        """Writes a batch of rendered images, e.g. from render_paths.
+
+        Parameters
+        ----------
+        frames : np.ndarray
+            Images of shape (count, height, width, 3)
+        filename : str
+            If it contains '%d', every frame is written to its own file,
+            numbered from 0. Otherwise all frames are written as one
+            animation, e.g. a .gif
+        duration : int, optional
+            Time each frame is shown in an animation, in milliseconds
+
+        Raises
+        ------
+        ValueError
+            If there are no frames to write as an animation
+        """
+        images = [Image.fromarray(frame) for frame in frames]
+        if '%d' in filename:
+            for number, image in enumerate(images):
+                image.save(filename % number)
+        else:
+            if not images:
+                raise ValueError("No frames to write to %s" % filename)
+            images[0].save(filename, save_all=True,
+                           append_images=images[1:], duration=duration,
+                           loop=0)
+
+    def show_map(self, themap: Union[np.ndarray, str] = None):
+        """Draws `themap` as an image and shows it.
+
+        Parameters
+        ----------
+        themap : np.ndarray or str, optional
+            The map to show. By default uses the string map
+        """
+        Image.fromarray(self.render_map(themap)).show()
@@ -0,0 +1,70 @@
+import os
+import numpy as np
+
+def mazeMap(size, seed=0):
+    """A size x size maze in the encoding of the Samfundet maps: -1 for
+    walls and 1..4 for the cost of the corridors. The rooms are the cells
+    with odd coordinates, and every room is joined to the room above or
+    to the left of it (a binary tree maze), so there is exactly one path
+    between two rooms. Returns (int map, start, goal), with the start in
+    the top left room and the goal in the bottom right room."""
+    rng = np.random.default_rng(seed)
+    int_map = np.full((size, size), -1, dtype=int)
+    rooms = np.arange(1, size - 1, 2)
+    roomX, roomY = np.meshgrid(rooms, rooms, indexing='ij')
+    int_map[roomX, roomY] = 1
+
+    # Open the wall above (True) or to the left (False) of every room. The
+    # top row can only go left, the left column only up.
+    up = rng.random(roomX.shape) < 0.5
+    up[0, :] = False
+    up[:, 0] = True
+    up[0, 0] = False # The first room has no room above or to the left
+    int_map[roomX[up] - 1, roomY[up]] = 1
+    left = ~up
+    left[0, 0] = False
+    int_map[roomX[left], roomY[left] - 1] = 1
+
+    floor = int_map > 0
+    int_map[floor] = rng.integers(1, 5, size=int(floor.sum()))
+    return int_map, [1, 1], [int(rooms[-1]), int(rooms[-1])]
+
+def openMap(size, seed=0, wallDensity=0.15):
+    """A size x size open map with costs 1..4, a wall around the border and
+    `wallDensity` of the other cells turned into walls at random. The start
+    and goal are in opposite corners. With few walls they are almost
+    always connected, but that is not guaranteed. Returns (int map, start,
+    goal)."""
+    rng = np.random.default_rng(seed)
+    int_map = rng.integers(1, 5, size=(size, size))
+    int_map[rng.random((size, size)) < wallDensity] = -1
+    int_map[0, :] = int_map[-1, :] = -1
+    int_map[:, 0] = int_map[:, -1] = -1
+    start, goal = [1, 1], [size - 2, size - 2]
+    int_map[1:3, 1:3] = np.maximum(int_map[1:3, 1:3], 1) # Keep the corners open
+    int_map[-3:-1, -3:-1] = np.maximum(int_map[-3:-1, -3:-1], 1)
+    return int_map, start, goal
+
+generators = {'maze': mazeMap, 'open': openMap}
+
+def writeMap(int_map, filename):
+    """Write an int map as a CSV file that Map_Obj can read."""
+    np.savetxt(filename, int_map, fmt='%d', delimiter=',')
+
+def generateMap(kind, size, seed=0, directory='generated_maps'):
+    """Generate a map of `kind` ('maze' or 'open') and write it to
+    `directory`. Returns (filename, start, goal). A file that already
+    exists for the same kind, size and seed is reused."""
+    int_map, start, goal = generators[kind](size, seed)
+    filename = os.path.join(directory, '%s_%d_seed%d.csv' % (kind, size, seed))
+    if not os.path.exists(filename):
+        os.makedirs(directory, exist_ok=True)
+        writeMap(int_map, filename)
+    return filename, start, goal
+
+
+if __name__ == '__main__':
+    for kind in generators:
+        for size in (100, 250, 500, 1000, 2000, 4000):
+            filename, start, goal = generateMap(kind, size)
+            print("%s: start %s, goal %s" % (filename, start, goal))
@@ -0,0 +1,125 @@
+import heapq
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from AStarSearch import SearchResult, neighborIndices
+
+# Set in every worker process by attachWorker
+workerMemory = None
+workerCosts = None
+workerShape = None
+
+def attachWorker(name, shape, dtype):
+    # Attach to the shared int map without copying it. The memoryview reads
+    # the buffer directly and returns plain ints, which is faster per cell
+    # than indexing the numpy array
+    global workerMemory, workerCosts, workerShape
+    workerMemory = shared_memory.SharedMemory(name=name)
+    workerCosts = memoryview(np.ndarray(shape, dtype=dtype, buffer=workerMemory.buf).ravel())
+    workerShape = shape
+
+def sharedFindPath(costs, rows, cols, start_pos, goal_pos):
+    """A* over the flat cell costs `costs` (anything indexable by flat
+    index, here a view of the shared buffer), like GridSearch.findPath but
+    without any preprocessing: the passable neighbors are found with
+    neighborIndices while searching. The neighbors are visited in the same
+    order and ties are broken the same way, so the results are the same as
+    those of findPath. Returns a SearchResult."""
+    startTime = time.perf_counter()
+    start = start_pos[0] * cols + start_pos[1]
+    goal = goal_pos[0] * cols + goal_pos[1]
+    goalX, goalY = divmod(goal, cols)
+
+    g = {start: 0}
+    cameFrom = {start: None}
+    closed = set()
+    counter = itertools.count()
+    frontier = [(0, next(counter), start)]
+    while frontier:
+        _, _, current = heapq.heappop(frontier)
+        if current in closed:
+            continue
+        if current == goal:
+            path = [goal]
+            while cameFrom[path[-1]] is not None:
+                path.append(cameFrom[path[-1]])
+            return SearchResult(tuple(divmod(i, cols) for i in reversed(path)), g[goal],
+                                len(closed), time.perf_counter() - startTime)
+        closed.add(current)
+
+        for neighbor in neighborIndices(current, rows, cols):
+            value = costs[neighbor]
+            if value <= 0: # Wall
+                continue
+            cost = g[current] + value
+            if cost < g.get(neighbor, float('inf')):
+                g[neighbor] = cost
+                cameFrom[neighbor] = current
+                x, y = divmod(neighbor, cols)
+                heapq.heappush(frontier, (cost + abs(x - goalX) + abs(y - goalY), next(counter), neighbor))
+    return SearchResult(None, None, len(closed), time.perf_counter() - startTime) # No path found
+
+def workerFindPath(query):
+    return sharedFindPath(workerCosts, workerShape[0], workerShape[1], *query)
+
+def parallelSearch(map_obj, queries, workers=None, chunksize=None):
+    """Answer every (start_pos, goal_pos) in `queries` on a pool of worker
+    processes. The int map is put in shared memory once, and the workers
+    search directly on it with sharedFindPath instead of receiving a copy
+    or building a GridSearch. Queries are sent in chunks, and the
+    SearchResults are returned in the same order as the queries.
+
+    The map is stored once for all workers (one byte per cell for the
+    Samfundet maps), and the memory used per worker only grows with the
+    cells a query explores (its g, cameFrom, closed and frontier), not
+    with the size of the map. A GridSearch in every worker would instead
+    hold its own Python lists of the costs, neighbors and search state,
+    which is well over 100 bytes per cell per worker.
+
+    Parameters
+    ----------
+    map_obj : Map_Obj
+        The map to search
+    queries : list
+        (start_pos, goal_pos) pairs
+    workers : int, optional
+        Number of processes, by default one per core
+    chunksize : int, optional
+        Queries sent to a worker at a time, by default spread evenly with
+        about four chunks per worker
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(queries) // (workers * 4))
+    int_map = np.ascontiguousarray(map_obj.int_map)
+    memory = shared_memory.SharedMemory(create=True, size=int_map.nbytes)
+    try:
+        np.ndarray(int_map.shape, dtype=int_map.dtype, buffer=memory.buf)[:] = int_map
+        with ProcessPoolExecutor(workers, initializer=attachWorker,
+                                 initargs=(memory.name, int_map.shape, int_map.dtype.str)) as pool:
+            return list(pool.map(workerFindPath, queries, chunksize=chunksize))
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+if __name__ == '__main__':
+    import random
+    import time
+    import Map
+
+    map_obj = Map.Map_Obj(task=4)
+    rows, cols = map_obj.int_map.shape
+    cells = [[x, y] for x in range(rows) for y in range(cols) if map_obj.int_map[x, y] > 0]
+    random.seed(0)
+    queries = [(random.choice(cells), random.choice(cells)) for _ in range(20000)]
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        startTime = time.perf_counter()
+        parallelSearch(map_obj, queries, workers)
+        elapsed = time.perf_counter() - startTime
+        print("%d workers: %.0f queries/s" % (workers, len(queries) / elapsed))
+        workers *= 2
@@ -1,50 +1,62 @@
 from queue import PriorityQueue
+import numpy as np
 import Map
 
 class Node:
-    def __init__(self, position, cellValue=0):
+    def __init__(self, position, cellValue=0, id=0):
         self.position = position
         self.cellValue = cellValue
+        self.id = id  # Index of the node in the graph arrays
         self.g = float('inf')
         self.f = float('inf')
         self.cameFrom = None
-        self.neighbors = []  # List of connected nodes
 
     def __lt__(self, other):
         return self.f < other.f
 
-    def add_neighbor(self, neighbor):
-        self.neighbors.append(neighbor)
-
-class Edge:
-    def __init__(self, node1, node2, cost):
-        self.node1 = node1
-        self.node2 = node2
-        self.cost = cost
+class Graph:
+    """Adjacency of the nodes in CSR form. The neighbors of the node with id
+    i are neighborIds[offsets[i]:offsets[i + 1]], and the cost of each of
+    those edges is stored at the same index in edgeCosts."""
+    def __init__(self, nodes, nodeList, offsets, neighborIds, edgeCosts):
+        self.nodes = nodes  # Dictionary from position tuple to node
+        self.nodeList = nodeList  # Nodes ordered by id
+        self.offsets = offsets
+        self.neighborIds = neighborIds
+        self.edgeCosts = edgeCosts
+
+    def neighbors(self, node):
+        # Yield (neighbor node, edge cost) pairs, each lookup is O(1)
+        for k in range(self.offsets[node.id], self.offsets[node.id + 1]):
+            yield self.nodeList[self.neighborIds[k]], self.edgeCosts[k]
 
 def createGraph(map_obj):
     nodes = {}
-    edges = []
+    nodeList = []
 
     for i in range(map_obj.int_map.shape[0]):
         for j in range(map_obj.int_map.shape[1]):
             if map_obj.get_cell_value([i, j]) > 0:
-                node = Node([i, j], cellValue=map_obj.get_cell_value([i, j]))
+                node = Node([i, j], cellValue=map_obj.get_cell_value([i, j]), id=len(nodeList))
                 nodes[(i, j)] = node
-
-    # Create edges based on neighboring nodes
-    for node in nodes.values():
+                nodeList.append(node)
+
+    # Create edges based on neighboring nodes. Every directed edge is stored once,
+    # and the edges of a node are stored next to each other.
+    offsets = [0]
+    neighborIds = []
+    edgeCosts = []
+    for node in nodeList:
         for dir in [[1, 0], [0, 1], [-1, 0], [0, -1]]:
-            neighbor_pos = [node.position[0] + dir[0], node.position[1] + dir[1]]
-            if tuple(neighbor_pos) in nodes:
-                neighbor_node = nodes[tuple(neighbor_pos)]
-                edge_cost = node.cellValue + neighbor_node.cellValue
-                edge = Edge(node, neighbor_node, edge_cost)
-                edges.append(edge)
-                node.add_neighbor(neighbor_node)
-                neighbor_node.add_neighbor(node)
+            neighbor_pos = (node.position[0] + dir[0], node.position[1] + dir[1])
+            if neighbor_pos in nodes:
+                neighbor_node = nodes[neighbor_pos]
+                neighborIds.append(neighbor_node.id)
+                edgeCosts.append(node.cellValue + neighbor_node.cellValue)
+        offsets.append(len(neighborIds))
 
-    return nodes, edges
+    return Graph(nodes, nodeList, np.array(offsets), np.array(neighborIds),
+                 np.array(edgeCosts))
 
 def heuristic_manhattan(curr, goalNode):
     return abs(curr.position[0] - goalNode.position[0]) + abs(curr.position[1] - goalNode.position[1])
@@ -52,8 +64,9 @@ def heuristic_manhattan(curr, goalNode):
 def heuristic_euclidean(curr, goalNode):
     return ((curr.position[0] - goalNode.position[0])**2 + (curr.position[1] - goalNode.position[1])**2)**0.5
 
-def aStarSearch(graph, start_pos, goal_pos):
-    nodes, edges = graph
+def aStarSearch(graph, start_pos, goal_pos, stats=None):
+    # If a stats dict is given, the number of expanded nodes is counted in stats['expanded']
+    nodes = graph.nodes
     startNode = nodes[tuple(start_pos)]
     goalNode = nodes[tuple(goal_pos)]
 
@@ -63,6 +76,8 @@ def aStarSearch(graph, start_pos, goal_pos):
 
     while not frontier.empty():
         currentNode = frontier.get()
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + 1
 
         if currentNode == goalNode:
             # Reconstruct and return the path.
@@ -73,29 +88,22 @@ def aStarSearch(graph, start_pos, goal_pos):
                 current = nodes[tuple(current)].cameFrom
             return path[::-1]  # Reverse the path to start from the start node.
 
-        for neighbor_node in currentNode.neighbors:
-            edge_cost = None
-            for edge in edges:
-                if (edge.node1 == currentNode and edge.node2 == neighbor_node) or \
-                   (edge.node2 == currentNode and edge.node1 == neighbor_node):
-                    edge_cost = edge.cost
-                    break
-
-            if edge_cost is not None:
-                cost = currentNode.g + edge_cost
+        for neighbor_node, edge_cost in graph.neighbors(currentNode):
+            cost = currentNode.g + edge_cost
 
-                if cost < neighbor_node.g:
-                    neighbor_node.g = cost
-                    neighbor_node.f = cost + heuristic_euclidean(neighbor_node, goalNode)
-                    frontier.put(neighbor_node, neighbor_node.f)
-                    neighbor_node.cameFrom = currentNode.position
+            if cost < neighbor_node.g:
+                neighbor_node.g = cost
+                neighbor_node.f = cost + heuristic_euclidean(neighbor_node, goalNode)
+                frontier.put(neighbor_node, neighbor_node.f)
+                neighbor_node.cameFrom = currentNode.position
 
     return None  # No path found
 
-map_obj = Map.Map_Obj(task=2)
-path = aStarSearch(createGraph(map_obj), map_obj.get_start_pos(), map_obj.get_goal_pos())
+if __name__ == '__main__':
+    map_obj = Map.Map_Obj(task=2)
+    path = aStarSearch(createGraph(map_obj), map_obj.get_start_pos(), map_obj.get_goal_pos())
 
-for node in path:
-    map_obj.set_cell_value(node, 5)
+    for node in path:
+        map_obj.set_cell_value(node, 5)
 
-map_obj.show_map()
\ No newline at end of file
+    map_obj.show_map()
\ No newline at end of file
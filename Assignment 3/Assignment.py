@@ -2,7 +2,7 @@
 # Original code by Håkon Måløy
 # Updated by Xavier Sánchez Díaz
 
-import copy
+from collections import deque
 from itertools import product as prod
 
 
@@ -11,15 +11,48 @@ class CSP:
         # self.variables is a list of the variable names in the CSP
         self.variables = []
 
-        # self.domains is a dictionary of domains (lists)
+        # self.domains is a dictionary of domains (lists). During the
+        # search a domain is an integer bitmask, where bit k set means
+        # that self.domains[var][k] is still a legal value
         self.domains = {}
 
         # self.constraints[i][j] is a list of legal value pairs for
         # the variable pair (i, j)
         self.constraints = {}
+
+        # self.supports[i][j][k] is a bitmask over the domain of j, with
+        # the values that are legal together with the k-th value of i
+        self.supports = {}
+
+        # self.all_different is a list of the global Alldiff constraints,
+        # as (variables, value ids) where value_ids[var][k] numbers the
+        # k-th value of var, so equal values of different variables get
+        # the same id. self.all_different_of[var] lists the constraints
+        # (by index) that var is part of
+        self.all_different = []
+        self.all_different_of = {}
         
         self.num_of_backtracking_calls = 0 # Number of calls to the backtrack function.
         self.num_of_backtracking_fails = 0 # Number of times the backtrack function returns False.
+        self.num_of_revisions = 0 # Number of calls to the revise function.
+
+        # (variable, old bitmask) for every domain change made during the
+        # search, so the changes can be undone when backtracking
+        self.trail = []
+
+        # Number of legal values left for every variable, kept up to date
+        # by set_domain and undo so the variable ordering does not have
+        # to count bits
+        self.domain_sizes = {}
+
+        # Strategies used by select_unassigned_variable and
+        # order_domain_values, set by backtracking_search
+        self.variable_ordering = 'first'
+        self.value_ordering = 'domain'
+
+        # Weight of every arc for the 'domwdeg' variable ordering, the
+        # number of times revising it (or its reverse) emptied a domain
+        self.weights = {}
 
 
     def add_variable(self, name: str, domain: list):
@@ -35,6 +68,8 @@ class CSP:
         self.variables.append(name)
         self.domains[name] = list(domain)
         self.constraints[name] = {}
+        self.supports[name] = {}
+        self.all_different_of[name] = []
 
     def get_all_possible_pairs(self, a: list, b: list) -> list[tuple]:
         """Get a list of all possible pairs (as tuples) of the values in
@@ -117,36 +152,237 @@ class CSP:
                                              value_pair:
                                              filter_function(*value_pair),
                                              self.constraints[i][j]))
+        self.supports[i][j] = self.compile_supports(i, j)
+
+    def compile_supports(self, i: str, j: str) -> list[int]:
+        """Compile the legal value pairs of the constraint i -> j into one
+        bitmask over the domain of 'j' per value of 'i', so 'revise' can
+        check a value with a single bitwise and.
+
+        Parameters
+        ----------
+        i : str
+            Name of the first variable
+        j : str
+            Name of the second variable
 
-    def add_all_different_constraint(self, var_list: list):
+        Returns
+        -------
+        list[int]
+            Bitmask of the supporting values in the domain of `j`, for
+            every value in the domain of `i`
+        """
+        index_i = {x: k for k, x in enumerate(self.domains[i])}
+        index_j = {y: k for k, y in enumerate(self.domains[j])}
+        supports = [0] * len(self.domains[i])
+        for (x, y) in self.constraints[i][j]:
+            supports[index_i[x]] |= 1 << index_j[y]
+        return supports
+
+    def add_all_different_constraint(self, var_list: list,
+                                     global_all_different: bool = True):
         """Add an Alldiff constraint between all of the variables in the
         list provided.
 
+        The constraint is added both as binary constraints between every
+        pair of variables, and, unless 'global_all_different' is False, as
+        one global constraint that 'inference' filters with
+        'revise_all_different'. The binary constraints only prune once a
+        variable is decided, while the global constraint also finds hidden
+        pairs and other Hall sets.
+
         Parameters
         ----------
         var_list : list
             A list of variable names
+        global_all_different : bool
+            Whether to also add the global constraint
         """
         for (i, j) in self.get_all_possible_pairs(var_list, var_list):
             if i != j:
                 self.add_constraint_one_way(i, j, lambda x, y: x != y)
-
-    def backtracking_search(self):
+        if not global_all_different:
+            return
+
+        ids = {}
+        value_ids = {var: [ids.setdefault(value, len(ids)) for value in self.domains[var]]
+                     for var in var_list}
+        for var in var_list:
+            self.all_different_of[var].append(len(self.all_different))
+        self.all_different.append((list(var_list), value_ids))
+
+    def revise_all_different(self, assignment, index):
+        """Filter the global Alldiff constraint self.all_different[index]
+        with Régin's algorithm, and remove every value from the
+        bitmasks in 'assignment' that can not be part of any solution of
+        the constraint.
+
+        A maximum matching between the variables and the values tells if
+        the variables can take different values at all. A value that is
+        not in the matching is only kept if it lies on an alternating
+        path from a free value, or on an alternating cycle, i.e. in the
+        same strongly connected component as its variable when matched
+        edges point from variable to value and the other edges from
+        value to variable.
+
+        Returns the list of variables whose bitmask was changed, or None
+        if the constraint can not be satisfied.
+        """
+        variables, value_ids = self.all_different[index]
+        if all(self.domain_sizes[var] == 1 for var in variables): # The binary constraints have checked it all
+            return []
+        domains = {var: [value_ids[var][k] for k in range(len(value_ids[var])) if assignment[var] >> k & 1]
+                   for var in variables}
+
+        # Maximum matching with augmenting paths
+        match_var = {} # variable -> value
+        match_value = {} # value -> variable
+        def augment(var, seen):
+            for value in domains[var]:
+                if value not in seen:
+                    seen.add(value)
+                    if value not in match_value or augment(match_value[value], seen):
+                        match_var[var] = value
+                        match_value[value] = var
+                        return True
+            return False
+        for var in variables:
+            if not augment(var, set()):
+                return None # Fewer values than variables, a Hall set is violated
+
+        # Edges of the directed graph. The nodes are tagged as ('var', name)
+        # or ('val', value id), so names and values can never be mixed up.
+        edges = {('var', var): [('val', match_var[var])] for var in variables}
+        for var in variables:
+            for value in domains[var]:
+                if value != match_var[var]:
+                    edges.setdefault(('val', value), []).append(('var', var))
+        for value in match_value:
+            edges.setdefault(('val', value), [])
+
+        # Everything reachable from a free value
+        reached = [node for node in edges if node[0] == 'val' and node[1] not in match_value]
+        reachable = set(reached)
+        while reached:
+            for node in edges[reached.pop()]:
+                if node not in reachable:
+                    reachable.add(node)
+                    reached.append(node)
+
+        # Strongly connected components (Tarjan)
+        component = {}
+        order = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        def connect(node):
+            order[node] = lowlink[node] = len(order)
+            stack.append(node)
+            on_stack.add(node)
+            for other in edges[node]:
+                if other not in order:
+                    connect(other)
+                    lowlink[node] = min(lowlink[node], lowlink[other])
+                elif other in on_stack:
+                    lowlink[node] = min(lowlink[node], order[other])
+            if lowlink[node] == order[node]:
+                while True:
+                    other = stack.pop()
+                    on_stack.discard(other)
+                    component[other] = node
+                    if other == node:
+                        break
+        for node in edges:
+            if node not in order:
+                connect(node)
+
+        changed = []
+        for var in variables:
+            mask = assignment[var]
+            for k, value in enumerate(value_ids[var]):
+                if mask >> k & 1 and value != match_var[var] and ('val', value) not in reachable \
+                        and component[('val', value)] != component[('var', var)]:
+                    mask ^= 1 << k # No solution of the constraint gives var this value
+            if mask != assignment[var]:
+                self.set_domain(assignment, var, mask)
+                changed.append(var)
+        return changed
+
+    def backtracking_search(self, variable_ordering: str = 'first',
+                            value_ordering: str = 'domain'):
         """This functions starts the CSP solver and returns the found
-        solution.
+        solution, as a dictionary with a list of a single value for
+        every variable, or False if there is no solution.
+
+        Parameters
+        ----------
+        variable_ordering : str, optional
+            How the next variable is selected: 'first' takes the first
+            undecided variable, 'mrv' the one with the fewest legal
+            values left, 'degree' is 'mrv' with ties broken by the most
+            constraints to undecided variables, and 'domwdeg' takes the
+            smallest number of legal values divided by the weighted
+            degree, by default 'first'
+        value_ordering : str, optional
+            How the values of the variable are ordered: 'domain' tries
+            them in domain order, 'lcv' tries the value that rules out
+            the fewest values of the neighbors first, by default
+            'domain'
         """
-        # Make a so-called "deep copy" of the dictionary containing the
-        # domains of the CSP variables. The deep copy is required to
-        # ensure that any changes made to 'assignment' does not have any
-        # side effects elsewhere.
-        assignment = copy.deepcopy(self.domains)
+        self.variable_ordering = variable_ordering
+        self.value_ordering = value_ordering
+
+        # The partial assignment holds a bitmask per variable with all
+        # of its values set. The domain lists in self.domains are never
+        # changed, the search only clears bits in 'assignment'.
+        assignment = {var: (1 << len(self.domains[var])) - 1 for var in self.domains}
+        self.domain_sizes = {var: len(self.domains[var]) for var in self.domains}
+        self.weights = {arc: 1 for arc in self.get_all_arcs()}
+        self.trail = []
 
         # Run AC-3 on all constraints in the CSP, to weed out all of the
         # values that are not arc-consistent to begin with
-        self.inference(assignment, self.get_all_arcs())
+        if not self.inference(assignment, self.get_all_arcs()):
+            return False
 
         # Call backtrack with the partial assignment 'assignment'
-        return self.backtrack(assignment)
+        if not self.backtrack(assignment):
+            return False
+        return {var: self.get_values(var, assignment[var]) for var in assignment}
+
+    def get_values(self, var: str, mask: int) -> list:
+        """Get the list of values of variable 'var' whose bits are set in
+        'mask', in domain order.
+
+        Parameters
+        ----------
+        var : str
+            Name of the variable
+        mask : int
+            Bitmask over the domain of 'var'
+
+        Returns
+        -------
+        list
+            The values in the domain of `var` that are set in `mask`
+        """
+        return [value for k, value in enumerate(self.domains[var]) if mask >> k & 1]
+
+    def set_domain(self, assignment, var, mask):
+        """Replace the bitmask of 'var' in 'assignment' with 'mask', and
+        record the old bitmask on the trail so it can be undone.
+        """
+        self.trail.append((var, assignment[var]))
+        assignment[var] = mask
+        self.domain_sizes[var] = mask.bit_count()
+
+    def undo(self, assignment, mark):
+        """Undo every domain change on the trail after position 'mark'.
+        """
+        while len(self.trail) > mark:
+            var, mask = self.trail.pop()
+            assignment[var] = mask
+            self.domain_sizes[var] = mask.bit_count()
 
     def backtrack(self, assignment):
         """The function 'Backtrack' from the pseudocode in the
@@ -154,21 +390,21 @@ class CSP:
 
         The function is called recursively, with a partial assignment of
         values 'assignment'. 'assignment' is a dictionary that contains
-        a list of all legal values for the variables that have *not* yet
-        been decided, and a list of only a single value for the
+        a bitmask of all legal values for the variables that have *not*
+        yet been decided, and a bitmask with a single bit set for the
         variables that *have* been decided.
 
-        When all of the variables in 'assignment' have lists of length
-        one, i.e. when all variables have been assigned a value, the
-        function should return 'assignment'. Otherwise, the search
-        should continue. When the function 'inference' is called to run
-        the AC-3 algorithm, the lists of legal values in 'assignment'
-        should get reduced as AC-3 discovers illegal values.
-
-        IMPORTANT: For every iteration of the for-loop in the
-        pseudocode, you need to make a deep copy of 'assignment' into a
-        new variable before changing it. Every iteration of the for-loop
-        should have a clean slate and not see any traces of the old
+        When all of the variables in 'assignment' have a single bit set,
+        i.e. when all variables have been assigned a value, the function
+        should return 'assignment'. Otherwise, the search should
+        continue. When the function 'inference' is called to run the
+        AC-3 algorithm, the bitmasks in 'assignment' should get reduced
+        as AC-3 discovers illegal values.
+
+        Instead of copying 'assignment' for every iteration of the
+        for-loop, every change is recorded on self.trail, and undone
+        before the next value is tried. That way every iteration of the
+        loop has a clean slate and does not see any traces of the old
         assignments and inferences that took place in previous
         iterations of the loop.
         """
@@ -176,14 +412,15 @@ class CSP:
 
         if self.assignment_is_done(assignment): return assignment # If the assignment is done, return it. 
         var = self.select_unassigned_variable(assignment) # Select an unassigned variable. As specified in the task, it returns any value from the list.
-        for value in assignment[var]:
-            copied_assignment = copy.deepcopy(assignment) # Make a deep copy of the assignment. Such that the assignment is new every time.
-            copied_assignment[var] = [value] # Assign the value to the unassigned variable.
-            if self.inference(copied_assignment, self.get_all_arcs()): # Run the inference function.
-                result = self.backtrack(copied_assignment) # If the inference function returns true, run the backtrack function again.
+        mark = len(self.trail) # Everything after this point on the trail is undone before the next value.
+        for k in self.order_domain_values(var, assignment):
+            self.set_domain(assignment, var, 1 << k) # Assign the value to the unassigned variable.
+            if self.inference(assignment, self.get_all_neighboring_arcs(var)): # Run the inference function. Only the arcs into var can have lost support.
+                result = self.backtrack(assignment) # If the inference function returns true, run the backtrack function again.
                 if result: # If the result is true, return the result.
                     return result
-                
+            self.undo(assignment, mark) # Remove the assignment and the inferences made from it.
+
         self.num_of_backtracking_fails += 1 # Increase the backtracking fail counter.
         return False
 
@@ -192,58 +429,127 @@ class CSP:
         Checks if any of the domains have more than one possible value.        
         """
         for x in assigment:
-            if len(assigment[x]) > 1:
+            if assigment[x] & (assigment[x] - 1): # More than one bit is set
                 return False
         return True
 
     def select_unassigned_variable(self, assignment):
         """The function 'Select-Unassigned-Variable' from the pseudocode
         in the textbook. Should return the name of one of the variables
-        in 'assignment' that have not yet been decided, i.e. whose list
-        of legal values has a length greater than one.
+        in 'assignment' that have not yet been decided, i.e. whose
+        bitmask of legal values has more than one bit set. Which one
+        depends on self.variable_ordering, see backtracking_search.
+        """
+        if self.variable_ordering == 'first':
+            for domain in assignment:
+                if assignment[domain] & (assignment[domain] - 1):
+                    return domain #Return the first possible value.
+            return None
+
+        sizes = self.domain_sizes
+        undecided = [var for var in assignment if sizes[var] > 1]
+        if not undecided:
+            return None
+        if self.variable_ordering == 'mrv':
+            return min(undecided, key=lambda var: sizes[var])
+        if self.variable_ordering == 'degree':
+            return min(undecided, key=lambda var: (sizes[var], -sum(
+                1 for other in self.constraints[var] if sizes[other] > 1)))
+        if self.variable_ordering == 'domwdeg':
+            return min(undecided, key=lambda var: sizes[var] / max(1, sum(
+                self.weights[(var, other)] for other in self.constraints[var] if sizes[other] > 1)))
+        raise ValueError("Unknown variable ordering '%s'" % self.variable_ordering)
+
+    def order_domain_values(self, var, assignment):
+        """The function 'Order-Domain-Values' from the pseudocode in the
+        textbook. Returns the indices (bits) of the legal values of
+        'var' in the order they should be tried, which depends on
+        self.value_ordering, see backtracking_search.
         """
-        for domain in assignment:
-            if len(assignment[domain]) > 1:
-                return domain #Return the first possible value.
+        mask = assignment[var]
+        values = [k for k in range(len(self.domains[var])) if mask >> k & 1]
+        if self.value_ordering == 'domain':
+            return values
+        if self.value_ordering == 'lcv':
+            # Count the values each choice would rule out in the domains of the undecided neighbors
+            neighbors = [other for other in self.constraints[var] if self.domain_sizes[other] > 1]
+            return sorted(values, key=lambda k: sum(
+                (assignment[other] & ~self.supports[var][other][k]).bit_count() for other in neighbors))
+        raise ValueError("Unknown value ordering '%s'" % self.value_ordering)
 
     def inference(self, assignment, queue):
         """The function 'AC-3' from the pseudocode in the textbook.
         'assignment' is the current partial assignment, that contains
-        the lists of legal values for each undecided variable. 'queue'
-        is the initial queue of arcs that should be visited.
+        the bitmasks of legal values for each undecided variable.
+        'queue' is the initial queue of arcs that should be visited.
+
+        The arcs are kept in a deque together with a set of the arcs in
+        it, so an arc that is already waiting is not added again.
+
+        When no arc is left, the global Alldiff constraints of the
+        variables that were changed are filtered, and the arcs into the
+        variables they prune are added to the queue again.
         """ 
-        while queue: # If the queue is not emptu, pop the first element.
-            (xi, xj) = queue.pop(0) 
-            if self.revise(assignment, xi, xj): # If the revise function returns true, i.e., the partial assignment was changed, we need to add arcs to the queue.
-                if len(assignment[xi]) == 0: # We have found an inconsistency, return false.
+        queue = deque(queue)
+        in_queue = set(queue)
+        changed = {xj for (_, xj) in queue} # Variables whose Alldiff constraints must be filtered
+        while queue or changed:
+            while queue: # If the queue is not emptu, pop the first element.
+                (xi, xj) = queue.popleft()
+                in_queue.discard((xi, xj))
+                if self.revise(assignment, xi, xj): # If the revise function returns true, i.e., the partial assignment was changed, we need to add arcs to the queue.
+                    if assignment[xi] == 0: # We have found an inconsistency, return false.
+                        self.weights[(xi, xj)] += 1 # Make the variables of this constraint more likely to be selected by 'domwdeg'.
+                        self.weights[(xj, xi)] = self.weights.get((xj, xi), 1) + 1
+                        return False
+                    changed.add(xi)
+                    for arc in self.get_all_neighboring_arcs(xi): # Add all the arcs to the queue.
+                        if arc[0] != xj and arc not in in_queue: # We dont need to add the arc we just revised, or arcs already in the queue.
+                            queue.append(arc) # Add the arc to the queue.
+                            in_queue.add(arc)
+
+            constraints = {index for var in changed for index in self.all_different_of[var]}
+            changed = set()
+            for index in constraints:
+                pruned = self.revise_all_different(assignment, index)
+                if pruned is None: # The variables can not all be different, return false.
+                    variables = self.all_different[index][0]
+                    for (xi, xj) in self.get_all_possible_pairs(variables, variables): # Make the variables of this constraint more likely to be selected by 'domwdeg'.
+                        if xi != xj:
+                            self.weights[(xi, xj)] = self.weights.get((xi, xj), 1) + 1
                     return False
-                for (xk, xl) in self.get_all_neighboring_arcs(xi): # Add all the arcs to the queue.
-                    if xk != xj: # We dont need to add the arc we just revised.
-                        queue.append((xk, xl)) # Add the arc to the queue.
+                for var in pruned:
+                    changed.add(var)
+                    for arc in self.get_all_neighboring_arcs(var):
+                        if arc not in in_queue:
+                            queue.append(arc)
+                            in_queue.add(arc)
         return True
 
     def revise(self, assignment, i, j):
         """The function 'Revise' from the pseudocode in the textbook.
         'assignment' is the current partial assignment, that contains
-        the lists of legal values for each undecided variable. 'i' and
-        'j' specifies the arc that should be visited. If a value is
+        the bitmasks of legal values for each undecided variable. 'i'
+        and 'j' specifies the arc that should be visited. If a value is
         found in variable i's domain that doesn't satisfy the constraint
-        between i and j, the value should be deleted from i's list of
-        legal values in 'assignment'.
+        between i and j, its bit should be cleared in variable i's
+        bitmask in 'assignment'.
         """
-        to_remove = [] # List of domains to be removed from the assignment.
-        for x in assignment[i]:
-            should_remove = True # Dummy variable
-            for y in assignment[j]:
-                if (x, y) in self.constraints[i][j]: # If the value is not in the constraints, it should be removed.
-                    should_remove = False
-                    break
-            if should_remove: # If the value should be removed, add it to the list of domains to be removed. The value we checked for i shows it is not consistent.
-                to_remove.append(x) # Add the value to the list of domains to be removed.
-
-        for x in to_remove: # Remove the domains from the assignment.
-            assignment[i].remove(x)
-        return len(to_remove) > 0 # Return true if any domains were changed.
+        self.num_of_revisions += 1 # Increase the revision counter.
+        supports = self.supports[i][j]
+        mask_j = assignment[j]
+        mask = assignment[i]
+        bits_i = mask
+        while bits_i: # Go through the set bits of i, lowest first.
+            bit = bits_i & -bits_i
+            bits_i ^= bit
+            if not supports[bit.bit_length() - 1] & mask_j: # No value left in j's domain is legal with this value, so it should be removed.
+                mask ^= bit
+
+        if mask == assignment[i]:
+            return False
+        self.set_domain(assignment, i, mask) # Remove the values from the assignment, on the trail so it can be undone.
+        return True # Return true since the domain was changed.
 
 
 def create_map_coloring_csp():
@@ -253,19 +559,20 @@ def create_map_coloring_csp():
     """
     csp = CSP()
     states = ['WA', 'NT', 'Q', 'NSW', 'V', 'SA', 'T']
-    edges = {'SA': ['WA', 'NT', 'Q', 'NSW', 'V'],
-             'NT': ['WA', 'Q'], 'NSW': ['Q', 'V']}
+    # Every border is in one of these groups of mutual neighbors, so
+    # each group needs three different colors
+    neighbors = [['SA', 'WA', 'NT'], ['SA', 'NT', 'Q'],
+                 ['SA', 'Q', 'NSW'], ['SA', 'NSW', 'V']]
     colors = ['red', 'green', 'blue']
     for state in states:
         csp.add_variable(state, colors)
-    for state, other_states in edges.items():
-        for other_state in other_states:
-            csp.add_constraint_one_way(state, other_state, lambda i, j: i != j)
-            csp.add_constraint_one_way(other_state, state, lambda i, j: i != j)
+    for group in neighbors:
+        csp.add_all_different_constraint(group)
     return csp
 
 
-def create_sudoku_csp(filename: str) -> CSP:
+def create_sudoku_csp(filename: str,
+                      global_all_different: bool = True) -> CSP:
     """Instantiate a CSP representing the Sudoku board found in the text
     file named 'filename' in the current directory.
 
@@ -273,6 +580,9 @@ def create_sudoku_csp(filename: str) -> CSP:
     ----------
     filename : str
         Filename of the Sudoku board to solve
+    global_all_different : bool
+        Whether the rows, columns and boxes also get a global Alldiff
+        constraint, and not only the binary != constraints
 
     Returns
     -------
@@ -292,17 +602,19 @@ def create_sudoku_csp(filename: str) -> CSP:
 
     for row in range(9):
         csp.add_all_different_constraint(['%d-%d' % (row, col)
-                                          for col in range(9)])
+                                          for col in range(9)],
+                                         global_all_different)
     for col in range(9):
         csp.add_all_different_constraint(['%d-%d' % (row, col)
-                                         for row in range(9)])
+                                         for row in range(9)],
+                                         global_all_different)
     for box_row in range(3):
         for box_col in range(3):
             cells = []
             for row in range(box_row * 3, (box_row + 1) * 3):
                 for col in range(box_col * 3, (box_col + 1) * 3):
                     cells.append('%d-%d' % (row, col))
-            csp.add_all_different_constraint(cells)
+            csp.add_all_different_constraint(cells, global_all_different)
 
     return csp
 
@@ -321,26 +633,60 @@ def print_sudoku_solution(solution):
         if row == 2 or row == 5:
             print('------+-------+------')
 
-sudoku_csp = create_sudoku_csp('./easy.txt')
-solution = sudoku_csp.backtracking_search()
-print_sudoku_solution(solution)
-print("Number of backtracking calls: ", sudoku_csp.num_of_backtracking_calls)
-print("Number of backtracking fails: ", sudoku_csp.num_of_backtracking_fails)
-
-sudoku_csp = create_sudoku_csp('./medium.txt')
-solution = sudoku_csp.backtracking_search()
-print_sudoku_solution(solution)
-print("Number of backtracking calls: ", sudoku_csp.num_of_backtracking_calls)
-print("Number of backtracking fails: ", sudoku_csp.num_of_backtracking_fails)
-
-sudoku_csp = create_sudoku_csp('./hard.txt')
-solution = sudoku_csp.backtracking_search()
-print_sudoku_solution(solution)
-print("Number of backtracking calls: ", sudoku_csp.num_of_backtracking_calls)
-print("Number of backtracking fails: ", sudoku_csp.num_of_backtracking_fails)
-
-sudoku_csp = create_sudoku_csp('./veryhard.txt')
-solution = sudoku_csp.backtracking_search()
-print_sudoku_solution(solution)
-print("Number of backtracking calls: ", sudoku_csp.num_of_backtracking_calls)
-print("Number of backtracking fails: ", sudoku_csp.num_of_backtracking_fails)
\ No newline at end of file
+def compare_strategies(filenames: list[str]):
+    """Solve every Sudoku board in 'filenames' with every combination of
+    variable and value ordering, and print the number of backtracking
+    calls and fails of each.
+
+    The orderings are compared with the binary constraints only, since
+    the global Alldiff constraints solve most boards without any
+    backtracking, whatever the ordering. The effect of the global
+    constraints is shown as a separate row per board, with the default
+    orderings.
+
+    Parameters
+    ----------
+    filenames : list[str]
+        Filenames of the Sudoku boards to solve
+    """
+    print("%-15s %-10s %-8s %-8s %10s %10s" % ('board', 'variables', 'values', 'alldiff',
+                                              'calls', 'fails'))
+    for filename in filenames:
+        runs = [(variable_ordering, value_ordering, False)
+                for variable_ordering in ['first', 'mrv', 'degree', 'domwdeg']
+                for value_ordering in ['domain', 'lcv']]
+        runs.append(('first', 'domain', True))
+        for variable_ordering, value_ordering, global_all_different in runs:
+            csp = create_sudoku_csp(filename, global_all_different)
+            csp.backtracking_search(variable_ordering, value_ordering)
+            print("%-15s %-10s %-8s %-8s %10d %10d" % (filename, variable_ordering, value_ordering,
+                                                      'global' if global_all_different else 'binary',
+                                                      csp.num_of_backtracking_calls,
+                                                      csp.num_of_backtracking_fails))
+
+if __name__ == '__main__':
+    sudoku_csp = create_sudoku_csp('./easy.txt')
+    solution = sudoku_csp.backtracking_search()
+    print_sudoku_solution(solution)
+    print("Number of backtracking calls: ", sudoku_csp.num_of_backtracking_calls)
+    print("Number of backtracking fails: ", sudoku_csp.num_of_backtracking_fails)
+
+    sudoku_csp = create_sudoku_csp('./medium.txt')
+    solution = sudoku_csp.backtracking_search()
+    print_sudoku_solution(solution)
+    print("Number of backtracking calls: ", sudoku_csp.num_of_backtracking_calls)
+    print("Number of backtracking fails: ", sudoku_csp.num_of_backtracking_fails)
+
+    sudoku_csp = create_sudoku_csp('./hard.txt')
+    solution = sudoku_csp.backtracking_search()
+    print_sudoku_solution(solution)
+    print("Number of backtracking calls: ", sudoku_csp.num_of_backtracking_calls)
+    print("Number of backtracking fails: ", sudoku_csp.num_of_backtracking_fails)
+
+    sudoku_csp = create_sudoku_csp('./veryhard.txt')
+    solution = sudoku_csp.backtracking_search()
+    print_sudoku_solution(solution)
+    print("Number of backtracking calls: ", sudoku_csp.num_of_backtracking_calls)
+    print("Number of backtracking fails: ", sudoku_csp.num_of_backtracking_fails)
+
+    compare_strategies(['./easy.txt', './medium.txt', './hard.txt', './veryhard.txt'])